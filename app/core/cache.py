@@ -0,0 +1,190 @@
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Awaitable, Callable
+from uuid import UUID
+
+from fastapi import Response
+
+from app.core.config import settings
+
+RESTAURANT_LIST_KEY = "restaurants:all"
+
+
+def restaurant_key(restaurant_id: UUID) -> str:
+    return f"restaurants:{restaurant_id}"
+
+
+def menus_key(restaurant_id: UUID) -> str:
+    return f"menus:{restaurant_id}"
+
+
+class CacheBackend(ABC):
+    @abstractmethod
+    async def get(self, key: str) -> bytes | None: ...
+
+    @abstractmethod
+    async def set(self, key: str, value: bytes, ttl: int): ...
+
+    @abstractmethod
+    async def generation(self, key: str) -> int: ...
+
+    @abstractmethod
+    async def set_if_generation(
+        self, key: str, value: bytes, ttl: int, generation: int
+    ) -> bool: ...
+
+    @abstractmethod
+    async def invalidate(self, *keys: str): ...
+
+    def stats(self) -> dict:
+        return {"backend": type(self).__name__}
+
+
+class LRUCacheBackend(CacheBackend):
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, tuple[float, bytes]] = OrderedDict()
+        # Only keys that have been invalidated get a counter, so this stays
+        # as small as the set of restaurants and menus.
+        self._generations: dict[str, int] = {}
+        self.hits = 0
+        self.misses = 0
+        self.stale_skips = 0
+
+    async def get(self, key: str) -> bytes | None:
+        entry = self._entries.get(key)
+        if entry is None or entry[0] <= time.monotonic():
+            self._entries.pop(key, None)
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    async def set(self, key: str, value: bytes, ttl: int):
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def generation(self, key: str) -> int:
+        return self._generations.get(key, 0)
+
+    async def set_if_generation(
+        self, key: str, value: bytes, ttl: int, generation: int
+    ) -> bool:
+        # No await between the check and the write, so it is atomic here.
+        if self._generations.get(key, 0) != generation:
+            self.stale_skips += 1
+            return False
+        await self.set(key, value, ttl)
+        return True
+
+    async def invalidate(self, *keys: str):
+        for key in keys:
+            self._generations[key] = self._generations.get(key, 0) + 1
+            self._entries.pop(key, None)
+
+    def stats(self) -> dict:
+        return {
+            "backend": type(self).__name__,
+            "size": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "stale_skips": self.stale_skips,
+        }
+
+
+class RedisCacheBackend(CacheBackend):
+    # Generations live in Redis next to the entries, so an invalidation on
+    # one worker also stops a build that started on another from caching
+    # its stale body.
+    SET_IF_GENERATION = """
+    if tonumber(redis.call('GET', KEYS[2]) or '0') == tonumber(ARGV[3]) then
+        redis.call('SET', KEYS[1], ARGV[1], 'EX', ARGV[2])
+        return 1
+    end
+    return 0
+    """
+
+    def __init__(self, url: str, prefix: str = "oms:"):
+        try:
+            from redis import asyncio as redis
+        except ImportError as e:
+            raise RuntimeError(
+                "RESPONSE_CACHE_BACKEND=redis requires the 'redis' package"
+            ) from e
+
+        self.prefix = prefix
+        self._client = redis.from_url(url)
+        self._set_if_generation = self._client.register_script(
+            self.SET_IF_GENERATION
+        )
+        self.stale_skips = 0
+
+    async def get(self, key: str) -> bytes | None:
+        return await self._client.get(self.prefix + key)
+
+    async def set(self, key: str, value: bytes, ttl: int):
+        await self._client.set(self.prefix + key, value, ex=ttl)
+
+    def _generation_key(self, key: str) -> str:
+        return f"{self.prefix}gen:{key}"
+
+    async def generation(self, key: str) -> int:
+        return int(await self._client.get(self._generation_key(key)) or 0)
+
+    async def set_if_generation(
+        self, key: str, value: bytes, ttl: int, generation: int
+    ) -> bool:
+        stored = await self._set_if_generation(
+            keys=[self.prefix + key, self._generation_key(key)],
+            args=[value, ttl, generation],
+        )
+        if not stored:
+            self.stale_skips += 1
+        return bool(stored)
+
+    async def invalidate(self, *keys: str):
+        if not keys:
+            return
+        async with self._client.pipeline(transaction=True) as pipe:
+            for key in keys:
+                pipe.incr(self._generation_key(key))
+            pipe.delete(*(self.prefix + key for key in keys))
+            await pipe.execute()
+
+    def stats(self) -> dict:
+        return {"backend": type(self).__name__, "stale_skips": self.stale_skips}
+
+
+def build_cache_backend() -> CacheBackend:
+    if settings.RESPONSE_CACHE_BACKEND == "redis":
+        if not settings.RESPONSE_CACHE_URL:
+            raise RuntimeError("RESPONSE_CACHE_URL is required for the redis backend")
+        return RedisCacheBackend(settings.RESPONSE_CACHE_URL)
+
+    return LRUCacheBackend(max_entries=settings.RESPONSE_CACHE_MAX_ENTRIES)
+
+
+response_cache = build_cache_backend()
+
+
+async def cached_json_response(
+    key: str, build: Callable[[], Awaitable[bytes]]
+) -> Response:
+    body = await response_cache.get(key)
+    if body is None:
+        # An invalidation that lands while build() runs bumps the generation,
+        # so the body it read from before the write is not cached.
+        generation = await response_cache.generation(key)
+        body = await build()
+        await response_cache.set_if_generation(
+            key, body, settings.RESPONSE_CACHE_TTL_SECONDS, generation
+        )
+
+    return Response(content=body, media_type="application/json")
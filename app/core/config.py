@@ -4,24 +4,100 @@ from pydantic import ConfigDict
 
 class Settings(BaseSettings):
     DATABASE_URL: str
+    ASYNC_DATABASE_URL: str | None = None
+
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30
+    DB_POOL_PRE_PING: bool = True
+    DB_POOL_RECYCLE: int = 1800
+    DB_PGBOUNCER_TRANSACTION_MODE: bool = False
+
+    DB_PROFILER_HEADERS: bool = False
+    DB_PROFILER_STRICT: bool = False
+    DB_N_PLUS_ONE_THRESHOLD: int = 5
+    SLOW_REQUEST_MS: float = 500
+
     SECRET_KEY: str
     ALGORITHM: str = "HS256"
 
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 1440
     REFRESH_TOKEN_EXPIRE_MINUTES: int = 2880
+    CLAIMS_AUTH_MAX_AGE_MINUTES: int = 15
+    REFRESH_TOKEN_ROTATE_AFTER_MINUTES: int = 60
+    REFRESH_TOKEN_REUSE_GRACE_SECONDS: float = 10
+    REFRESH_REVOCATION_SYNC_SECONDS: float = 30
+    REFRESH_REVOCATION_MAX_STALENESS_SECONDS: float = 120
+
+    PASSWORD_RESET_TOKEN_TTL_MINUTES: int = 30
+    PASSWORD_RESET_URL: str = "http://localhost:8000/reset-password"
+    RESET_TOKEN_SWEEP_INTERVAL_SECONDS: float = 300
+    RESET_TOKEN_SWEEP_BATCH_SIZE: int = 1000
+
+    BCRYPT_ROUNDS: int = 12
+    PASSWORD_HASH_WORKERS: int = 4
+    PASSWORD_HASH_MAX_QUEUE: int = 256
+
+    AUTH_CACHE_MAX_ENTRIES: int = 10000
+    AUTH_CACHE_TTL_SECONDS: int = 60
+
+    RESPONSE_CACHE_BACKEND: str = "memory"
+    RESPONSE_CACHE_URL: str | None = None
+    RESPONSE_CACHE_MAX_ENTRIES: int = 1024
+    RESPONSE_CACHE_TTL_SECONDS: int = 300
 
     STRIPE_SECRET_KEY: str
     STRIPE_WEBHOOK_SECRET: str
+    PAYMENT_GATEWAY: str = "stripe"
+    STRIPE_API_BASE: str = "https://api.stripe.com"
+    STRIPE_TIMEOUT_SECONDS: float = 10
+    STRIPE_CONNECT_TIMEOUT_SECONDS: float = 3
+    STRIPE_MAX_RETRIES: int = 2
+    STRIPE_MAX_CONNECTIONS: int = 50
+    STRIPE_CIRCUIT_FAILURE_THRESHOLD: int = 5
+    STRIPE_CIRCUIT_RESET_SECONDS: float = 30
+    STRIPE_CIRCUIT_HALF_OPEN_MAX_CALLS: int = 1
+    FAKE_GATEWAY_LATENCY_MS: int = 0
+    FAKE_GATEWAY_CHECKOUT_URL: str = "https://checkout.fake.test/pay"
+    WEBHOOK_WORKER_BATCH_SIZE: int = 100
+    WEBHOOK_WORKER_POLL_SECONDS: float = 5
+    WEBHOOK_EVENT_MAX_ATTEMPTS: int = 5
+    WEBHOOK_EVENT_RETRY_SECONDS: float = 30
+
+    ORDER_EVENTS_BACKEND: str = "memory"
+    ORDER_EVENTS_LISTEN_URL: str | None = None
+    ORDER_EVENTS_CHANNEL: str = "order_events"
+    ORDER_EVENTS_QUEUE_SIZE: int = 100
+    ORDER_EVENTS_KEEPALIVE_SECONDS: float = 15
+    ORDER_EVENTS_RECONNECT_SECONDS: float = 5
 
     EMAIL_HOST: str
     EMAIL_PORT: int
     EMAIL_USERNAME: str
     EMAIL_PASSWORD: str
     EMAIL_FROM: str
+    EMAIL_USE_TLS: bool = True
+    EMAIL_SENDER_WORKERS: int = 2
+    EMAIL_BATCH_SIZE: int = 50
+    EMAIL_MAX_RETRIES: int = 3
+    EMAIL_RETRY_BACKOFF_SECONDS: float = 1
+    EMAIL_IDLE_TIMEOUT_SECONDS: float = 30
+    EMAIL_QUEUE_MAX_SIZE: int = 10000
+
+    LOG_LEVEL: str = "INFO"
+    LOG_JSON: bool = True
+    LOG_DEBUG_SAMPLE_RATE: float = 0.01
+    LOG_QUEUE_MAX_SIZE: int = 10000
 
     GOOGLE_CLIENT_ID: str
     GOOGLE_CLIENT_SECRET: str
     GOOGLE_REDIRECT_URI: str
+    GOOGLE_TOKEN_URL: str = "https://oauth2.googleapis.com/token"
+    GOOGLE_CERTS_URL: str = "https://www.googleapis.com/oauth2/v1/certs"
+    GOOGLE_CERTS_DEFAULT_TTL_SECONDS: float = 3600
+    GOOGLE_CERTS_MIN_REFETCH_SECONDS: float = 60
+    GOOGLE_TIMEOUT_SECONDS: float = 10
+    GOOGLE_CONNECT_TIMEOUT_SECONDS: float = 3
 
     class Config:
         env_file = ".env"
@@ -0,0 +1,156 @@
+import time
+
+from prometheus_client import CollectorRegistry, Counter, Histogram
+from prometheus_client.core import GaugeMetricFamily
+
+registry = CollectorRegistry()
+
+LATENCY_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.25, 0.5, 0.75, 1, 2.5, 5, 10,
+)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 100)
+
+REQUESTS = Counter(
+    "http_requests_total",
+    "HTTP requests by route template and status code.",
+    ["method", "route", "status"],
+    registry=registry,
+)
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route template.",
+    ["method", "route"],
+    buckets=LATENCY_BUCKETS,
+    registry=registry,
+)
+REQUEST_QUERIES = Histogram(
+    "http_request_db_queries",
+    "Database statements executed per request.",
+    ["method", "route"],
+    buckets=QUERY_COUNT_BUCKETS,
+    registry=registry,
+)
+REQUEST_QUERY_TIME = Histogram(
+    "http_request_db_seconds",
+    "Time spent executing database statements per request.",
+    ["method", "route"],
+    buckets=LATENCY_BUCKETS,
+    registry=registry,
+)
+STRIPE_LATENCY = Histogram(
+    "stripe_request_duration_seconds",
+    "Stripe API call latency, per attempt.",
+    ["endpoint", "outcome"],
+    buckets=LATENCY_BUCKETS,
+    registry=registry,
+)
+SMTP_LATENCY = Histogram(
+    "smtp_operation_duration_seconds",
+    "SMTP connect and send latency.",
+    ["operation", "outcome"],
+    buckets=LATENCY_BUCKETS,
+    registry=registry,
+)
+
+
+class StatsCollector:
+    # Reads a component's stats() at scrape time, so gauges cost nothing on
+    # the request path. Nested dicts become a label, e.g. the sync and
+    # async connection pools.
+    def __init__(self, name: str, stats, label: str = "kind"):
+        self.name = name
+        self.stats = stats
+        self.label = label
+
+    def collect(self):
+        families: dict[str, GaugeMetricFamily] = {}
+
+        def add(key, value, labels):
+            if isinstance(value, bool):
+                value = int(value)
+            if not isinstance(value, (int, float)):
+                return
+            metric = f"{self.name}_{key}"
+            if metric not in families:
+                families[metric] = GaugeMetricFamily(
+                    metric, f"{self.name} {key}", labels=list(labels)
+                )
+            families[metric].add_metric(list(labels.values()), value)
+
+        for key, value in self.stats().items():
+            if isinstance(value, dict):
+                for inner_key, inner_value in value.items():
+                    add(inner_key, inner_value, {self.label: key})
+            else:
+                add(key, value, {})
+
+        yield from families.values()
+
+
+def route_template(scope) -> str:
+    # The router stores the matched route in the scope, so the template
+    # costs nothing to look up once the request has been routed.
+    route = scope.get("route")
+    return getattr(route, "path", "unmatched")
+
+
+class InFlightCollector:
+    # Requests are only routed once they reach the app, so in-flight counts
+    # are grouped by template when scraped rather than when they start.
+    def __init__(self):
+        self.active: dict[int, dict] = {}
+
+    def collect(self):
+        family = GaugeMetricFamily(
+            "http_requests_in_progress",
+            "HTTP requests currently being served, by route template.",
+            labels=["method", "route"],
+        )
+        counts: dict[tuple[str, str], int] = {}
+        for scope in list(self.active.values()):
+            key = (scope["method"], route_template(scope))
+            counts[key] = counts.get(key, 0) + 1
+        for labels, count in counts.items():
+            family.add_metric(list(labels), count)
+        yield family
+
+
+in_flight = InFlightCollector()
+registry.register(in_flight)
+
+
+class MetricsMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        in_flight.active[id(scope)] = scope
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            in_flight.active.pop(id(scope), None)
+
+            method = scope["method"]
+            route = route_template(scope)
+            REQUESTS.labels(method, route, str(status)).inc()
+            REQUEST_LATENCY.labels(method, route).observe(elapsed)
+
+            # Filled in by the query profiler middleware inside this one.
+            stats = scope.get("query_stats")
+            if stats is not None:
+                REQUEST_QUERIES.labels(method, route).observe(stats.count)
+                REQUEST_QUERY_TIME.labels(method, route).observe(stats.seconds)
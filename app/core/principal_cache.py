@@ -0,0 +1,131 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from uuid import UUID
+
+from app.core.config import settings
+
+
+@dataclass(frozen=True)
+class UserSnapshot:
+    id: UUID
+    first_name: str
+    last_name: str
+    email: str
+    phone: str
+    role: str
+    address: str | None
+
+    @classmethod
+    def from_user(cls, user) -> "UserSnapshot":
+        return cls(
+            id=user.id,
+            first_name=user.first_name,
+            last_name=user.last_name,
+            email=user.email,
+            phone=user.phone,
+            role=user.role,
+            address=user.address,
+        )
+
+
+@dataclass(frozen=True)
+class Principal:
+    claims: dict
+    user: UserSnapshot
+    expires_at: float
+
+
+def token_key(token: str) -> str:
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+
+class PrincipalCache:
+    def __init__(self, max_entries: int, ttl_seconds: int):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[str, Principal] = OrderedDict()
+        self._keys_by_user: dict[UUID, set[str]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, key: str) -> Principal | None:
+        with self._lock:
+            principal = self._entries.get(key)
+            if principal is None:
+                self.misses += 1
+                return None
+
+            if principal.expires_at <= time.time():
+                self._remove(key)
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return principal
+
+    def set(self, key: str, claims: dict, user: UserSnapshot):
+        if self.max_entries <= 0:
+            return
+
+        expires_at = time.time() + self.ttl_seconds
+        token_exp = claims.get("exp")
+        if token_exp is not None:
+            expires_at = min(expires_at, float(token_exp))
+
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+            self._entries[key] = Principal(claims, user, expires_at)
+            self._keys_by_user.setdefault(user.id, set()).add(key)
+
+            while len(self._entries) > self.max_entries:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def invalidate_user(self, user_id: UUID):
+        with self._lock:
+            for key in self._keys_by_user.pop(user_id, ()):
+                if self._entries.pop(key, None) is not None:
+                    self.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._keys_by_user.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+    def _remove(self, key: str):
+        principal = self._entries.pop(key, None)
+        if principal is None:
+            return
+
+        keys = self._keys_by_user.get(principal.user.id)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._keys_by_user[principal.user.id]
+
+
+principal_cache = PrincipalCache(
+    max_entries=settings.AUTH_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.AUTH_CACHE_TTL_SECONDS,
+)
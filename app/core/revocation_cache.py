@@ -0,0 +1,115 @@
+import asyncio
+import logging
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import select
+
+from app.core.config import settings
+from app.database.db import AsyncSessionLocal
+from app.models.refresh_token import RefreshToken
+
+logger = logging.getLogger(__name__)
+
+
+class RevokedTokenSet:
+    # Revoked refresh-token ids, each kept only until the token would have
+    # expired anyway. Revocations made by this process are added directly;
+    # those made elsewhere arrive with the next sync.
+    def __init__(self, sync_interval: float, max_staleness: float):
+        self.sync_interval = sync_interval
+        self.max_staleness = max_staleness
+        self._revoked: dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._task: asyncio.Task | None = None
+        self._synced_since: datetime | None = None
+        self._last_sync: float | None = None
+        self.hits = 0
+        self.syncs = 0
+
+    def add(self, jti: str, expires_at: datetime):
+        if expires_at.tzinfo is None:
+            expires_at = expires_at.replace(tzinfo=timezone.utc)
+        with self._lock:
+            self._revoked[jti] = expires_at.timestamp()
+
+    def __contains__(self, jti: str) -> bool:
+        with self._lock:
+            found = jti in self._revoked
+            if found:
+                self.hits += 1
+            return found
+
+    def is_fresh(self) -> bool:
+        # Past this age the set may miss revocations from other workers, so
+        # callers must ask the database instead.
+        return (
+            self._last_sync is not None
+            and time.monotonic() - self._last_sync < self.max_staleness
+        )
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "revoked": len(self._revoked),
+                "fresh": self.is_fresh(),
+                "hits": self.hits,
+                "syncs": self.syncs,
+            }
+
+    async def _run(self):
+        while True:
+            try:
+                await self.sync()
+            except Exception:
+                logger.exception("Refresh token revocation sync failed")
+            await asyncio.sleep(self.sync_interval)
+
+    async def sync(self):
+        started = datetime.now(timezone.utc)
+        query = select(RefreshToken.jti, RefreshToken.expires_at).where(
+            RefreshToken.revoked.is_(True), RefreshToken.expires_at > started
+        )
+        if self._synced_since is not None:
+            # Overlap one interval so rotations still committing during the
+            # previous sync are not missed.
+            query = query.where(
+                RefreshToken.revoked_at
+                >= self._synced_since - timedelta(seconds=self.sync_interval)
+            )
+
+        async with AsyncSessionLocal() as db:
+            rows = (await db.execute(query)).all()
+
+        for jti, expires_at in rows:
+            self.add(jti, expires_at)
+
+        now = time.time()
+        with self._lock:
+            self._revoked = {
+                jti: exp for jti, exp in self._revoked.items() if exp > now
+            }
+
+        self._synced_since = started
+        self._last_sync = time.monotonic()
+        self.syncs += 1
+
+
+revoked_refresh_tokens = RevokedTokenSet(
+    sync_interval=settings.REFRESH_REVOCATION_SYNC_SECONDS,
+    max_staleness=settings.REFRESH_REVOCATION_MAX_STALENESS_SECONDS,
+)
@@ -1,20 +1,28 @@
+import time
+from dataclasses import dataclass
 from datetime import datetime, timedelta
+from uuid import UUID
 from jose import jwt, JWTError
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import settings
-from app.database.db import get_db
+from app.database.db import get_async_db
+from app.core.principal_cache import UserSnapshot, principal_cache, token_key
 from app.models.user import User
 
 security = HTTPBearer()
 
 
 def create_access_token(data: dict):
+    # Callers that know the user's role pass "role" and "role_at" (when the
+    # role was read from the database) so admin routes can skip the lookup.
     to_encode = data.copy()
-    expire = datetime.utcnow() + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
-    to_encode.update({"exp": expire, "type": "access"})
+    now = datetime.utcnow()
+    expire = now + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+    to_encode.update({"exp": expire, "iat": now, "type": "access"})
     return jwt.encode(
         to_encode,
         settings.SECRET_KEY,
@@ -24,10 +32,9 @@ def create_access_token(data: dict):
 
 def create_refresh_token(data: dict):
     to_encode = data.copy()
-    expire = datetime.utcnow() + timedelta(
-        minutes=settings.REFRESH_TOKEN_EXPIRE_MINUTES
-    )
-    to_encode.update({"exp": expire, "type": "refresh"})
+    now = datetime.utcnow()
+    expire = now + timedelta(minutes=settings.REFRESH_TOKEN_EXPIRE_MINUTES)
+    to_encode.update({"exp": expire, "iat": now, "type": "refresh"})
     return jwt.encode(
         to_encode,
         settings.SECRET_KEY,
@@ -35,36 +42,93 @@ def create_refresh_token(data: dict):
     )
 
 
-def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db),
-):
-    token = credentials.credentials
+def role_claims(role: str) -> dict:
+    return {"role": role, "role_at": int(time.time())}
 
-    credentials_exception = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="Invalid or expired token",
-    )
 
+credentials_exception = HTTPException(
+    status_code=status.HTTP_401_UNAUTHORIZED,
+    detail="Invalid or expired token",
+)
+
+
+def decode_access_token(token: str) -> dict:
     try:
         payload = jwt.decode(
             token,
             settings.SECRET_KEY,
             algorithms=[settings.ALGORITHM],
         )
+    except JWTError:
+        raise credentials_exception
 
-        if payload.get("type") != "access":
-            raise credentials_exception
+    if payload.get("type") != "access" or payload.get("sub") is None:
+        raise credentials_exception
 
-        user_id: str | None = payload.get("sub")
-        if user_id is None:
-            raise credentials_exception
+    return payload
 
-    except JWTError:
+
+async def load_principal(token: str, db: AsyncSession) -> UserSnapshot:
+    cache_key = token_key(token)
+    cached = principal_cache.get(cache_key)
+    if cached is not None:
+        return cached.user
+
+    payload = decode_access_token(token)
+    try:
+        user_id = UUID(payload["sub"])
+    except ValueError:
         raise credentials_exception
 
-    user = db.query(User).filter(User.id == user_id).first()
+    user = await db.scalar(select(User).where(User.id == user_id))
     if user is None:
         raise credentials_exception
 
-    return user
+    snapshot = UserSnapshot.from_user(user)
+    principal_cache.set(cache_key, payload, snapshot)
+
+    return snapshot
+
+
+async def get_current_user(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: AsyncSession = Depends(get_async_db),
+) -> UserSnapshot:
+    return await load_principal(credentials.credentials, db)
+
+
+@dataclass(frozen=True)
+class AuthClaims:
+    id: UUID
+    role: str
+
+
+def require_role(*roles: str, detail: str):
+    # Trusts the signed role claim while it is younger than
+    # CLAIMS_AUTH_MAX_AGE_MINUTES; older or role-less tokens fall back to
+    # the user lookup, so a demotion takes effect within that window.
+    async def dependency(
+        credentials: HTTPAuthorizationCredentials = Depends(security),
+        db: AsyncSession = Depends(get_async_db),
+    ) -> AuthClaims:
+        token = credentials.credentials
+        payload = decode_access_token(token)
+
+        role = payload.get("role")
+        role_age = time.time() - payload.get("role_at", 0)
+        if role is None or role_age > settings.CLAIMS_AUTH_MAX_AGE_MINUTES * 60:
+            role = (await load_principal(token, db)).role
+
+        if role.lower() not in roles:
+            raise HTTPException(403, detail)
+
+        try:
+            return AuthClaims(id=UUID(payload["sub"]), role=role)
+        except ValueError:
+            raise credentials_exception
+
+    return dependency
+
+
+require_admin = require_role("admin", detail="Admin access required")
+require_partner = require_role("admin", "partner", detail="Partner access required")
@@ -1,13 +1,77 @@
+from uuid import uuid4
+
 from sqlalchemy import create_engine
+from sqlalchemy.schema import CreateIndex
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy.pool import NullPool
 
 from app.core.config import settings
+from app.database.pool import (
+    InstrumentedAsyncQueuePool,
+    InstrumentedQueuePool,
+    pool_status,
+)
+from app.database.profiler import install_profiler
 
 DATABASE_URL = settings.DATABASE_URL
 
-engine = create_engine(DATABASE_URL)
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "postgres": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+
+def to_async_url(url: str) -> str:
+    scheme, sep, rest = url.partition("://")
+    return ASYNC_DRIVERS.get(scheme, scheme) + sep + rest
+
+
+ASYNC_DATABASE_URL = settings.ASYNC_DATABASE_URL or to_async_url(DATABASE_URL)
+
+
+def pool_options(poolclass) -> dict:
+    if settings.DB_PGBOUNCER_TRANSACTION_MODE:
+        return {"poolclass": NullPool}
+
+    return {
+        "poolclass": poolclass,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+    }
+
+
+def async_connect_args() -> dict:
+    # PgBouncer in transaction mode hands each transaction a different
+    # server connection, so asyncpg must not cache prepared statements.
+    if settings.DB_PGBOUNCER_TRANSACTION_MODE and "asyncpg" in ASYNC_DATABASE_URL:
+        return {
+            "statement_cache_size": 0,
+            "prepared_statement_name_func": lambda: f"__asyncpg_{uuid4()}__",
+        }
+    return {}
+
+
+engine = create_engine(DATABASE_URL, **pool_options(InstrumentedQueuePool))
+async_engine = create_async_engine(
+    ASYNC_DATABASE_URL,
+    connect_args=async_connect_args(),
+    **pool_options(InstrumentedAsyncQueuePool),
+)
+
+install_profiler(engine)
+install_profiler(async_engine.sync_engine)
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine, autoflush=False, expire_on_commit=False
+)
 
 Base = declarative_base()
 
@@ -18,3 +82,32 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+def create_missing_indexes(bind):
+    # create_all() skips tables that already exist, so indexes added to a
+    # model later never reach an existing database. IF NOT EXISTS makes this
+    # a no-op once they are there. On a large Postgres table, build the
+    # index CONCURRENTLY by hand first to avoid blocking writes.
+    with bind.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            for index in table.indexes:
+                conn.execute(CreateIndex(index, if_not_exists=True))
+
+
+def insert_on_conflict(model):
+    if async_engine.dialect.name == "sqlite":
+        return sqlite.insert(model)
+    return postgresql.insert(model)
+
+
+def get_pool_stats() -> dict:
+    return {
+        "sync": pool_status(engine.pool),
+        "async": pool_status(async_engine.sync_engine.pool),
+    }
@@ -0,0 +1,109 @@
+import threading
+import time
+
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+
+class PoolStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.checkout_timeouts = 0
+        self.wait_time_total = 0.0
+        self.wait_time_max = 0.0
+        self.connects = 0
+        self.connect_time_total = 0.0
+        self.connect_time_max = 0.0
+
+    def record_checkout(self, waited: float):
+        with self._lock:
+            self.checkouts += 1
+            self.wait_time_total += waited
+            if waited > self.wait_time_max:
+                self.wait_time_max = waited
+
+    def record_timeout(self, waited: float):
+        with self._lock:
+            self.checkout_timeouts += 1
+            self.wait_time_total += waited
+            if waited > self.wait_time_max:
+                self.wait_time_max = waited
+
+    def record_connect(self, elapsed: float):
+        with self._lock:
+            self.connects += 1
+            self.connect_time_total += elapsed
+            if elapsed > self.connect_time_max:
+                self.connect_time_max = elapsed
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            attempts = self.checkouts + self.checkout_timeouts
+            return {
+                "checkouts": self.checkouts,
+                "checkout_timeouts": self.checkout_timeouts,
+                "wait_time_total_seconds": round(self.wait_time_total, 6),
+                "wait_time_avg_seconds": (
+                    round(self.wait_time_total / attempts, 6) if attempts else 0.0
+                ),
+                "wait_time_max_seconds": round(self.wait_time_max, 6),
+                "connects": self.connects,
+                "connect_time_total_seconds": round(self.connect_time_total, 6),
+                "connect_time_max_seconds": round(self.connect_time_max, 6),
+            }
+
+
+# `stats` lives on the class so it survives Pool.recreate(), which
+# SQLAlchemy calls on dispose and after invalidation.
+class InstrumentedPoolMixin:
+    stats: PoolStats
+
+    def _create_connection(self):
+        start = time.perf_counter()
+        record = super()._create_connection()
+        elapsed = time.perf_counter() - start
+        self.stats.record_connect(elapsed)
+        # Stamped on the record rather than kept on the pool, because async
+        # checkouts interleave on one thread while a connect is awaited.
+        record._connect_seconds = elapsed
+        return record
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            record = super()._do_get()
+        except exc.TimeoutError:
+            self.stats.record_timeout(time.perf_counter() - start)
+            raise
+        # Opening a new connection is connect latency, not pool contention.
+        connect = record.__dict__.pop("_connect_seconds", 0.0)
+        self.stats.record_checkout(time.perf_counter() - start - connect)
+        return record
+
+
+class InstrumentedQueuePool(InstrumentedPoolMixin, QueuePool):
+    stats = PoolStats()
+
+
+class InstrumentedAsyncQueuePool(InstrumentedPoolMixin, AsyncAdaptedQueuePool):
+    stats = PoolStats()
+
+
+def pool_status(pool) -> dict:
+    status = {"pool_class": type(pool).__name__}
+
+    if isinstance(pool, QueuePool):
+        status.update(
+            {
+                "size": pool.size(),
+                "checked_in": pool.checkedin(),
+                "checked_out": pool.checkedout(),
+                "overflow": max(pool.overflow(), 0),
+            }
+        )
+
+    if isinstance(pool, InstrumentedPoolMixin):
+        status.update(pool.stats.snapshot())
+
+    return status
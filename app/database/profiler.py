@@ -0,0 +1,153 @@
+import logging
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from sqlalchemy import event
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class NPlusOneError(RuntimeError):
+    pass
+
+
+class QueryStats:
+    __slots__ = ("count", "seconds", "shapes")
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+        # Keyed by the SQL text, which carries placeholders rather than
+        # values, so a loop of lookups shows up as one repeated shape.
+        self.shapes: Counter[str] = Counter()
+
+    def repeated(self, threshold: int) -> list[tuple[str, int]]:
+        return [
+            (statement, count)
+            for statement, count in self.shapes.most_common()
+            if count > threshold
+        ]
+
+
+current_query_stats: ContextVar[QueryStats | None] = ContextVar(
+    "current_query_stats", default=None
+)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info["query_started"].pop()
+    stats = current_query_stats.get()
+    if stats is not None:
+        stats.count += 1
+        stats.seconds += time.perf_counter() - started
+        stats.shapes[statement] += 1
+
+
+def _handle_error(context):
+    # after_cursor_execute does not run for a failed statement, so its
+    # start time is dropped here; otherwise it would pair with the next
+    # query on this pooled connection.
+    # Errors outside a statement (connect, commit) have no execution context
+    # and never pushed a start time.
+    conn = context.connection
+    if conn is None or context.execution_context is None:
+        return
+    started = conn.info.get("query_started")
+    if started:
+        started.pop()
+
+
+def install_profiler(engine):
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
+
+
+@contextmanager
+def profile_queries():
+    stats = QueryStats()
+    token = current_query_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        current_query_stats.reset(token)
+
+
+def check_repeated_queries(stats: QueryStats, where: str):
+    repeated = stats.repeated(settings.DB_N_PLUS_ONE_THRESHOLD)
+    if not repeated:
+        return
+
+    statement, count = repeated[0]
+    message = f"Possible N+1 in {where}: statement ran {count} times"
+    if settings.DB_PROFILER_STRICT:
+        raise NPlusOneError(f"{message}: {statement}")
+    logger.warning(message, extra={"statement": statement, "count": count})
+
+
+class QueryProfilerMiddleware:
+    # The stats object is also left in the scope so outer middleware (the
+    # Prometheus one) can read it after the request finishes.
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        stats = QueryStats()
+        scope["query_stats"] = stats
+        where = f"{scope['method']} {scope['path']}"
+        streaming = False
+
+        async def send_wrapper(message):
+            nonlocal streaming
+            if message["type"] == "http.response.start":
+                streaming = any(
+                    name == b"content-type" and value.startswith(b"text/event-stream")
+                    for name, value in message.get("headers", [])
+                )
+                # Endpoints finish their queries before the response starts,
+                # so the totals are complete here for non-streaming routes.
+                check_repeated_queries(stats, where)
+                if settings.DB_PROFILER_HEADERS:
+                    message["headers"] = [
+                        *message.get("headers", []),
+                        (b"x-db-queries", str(stats.count).encode()),
+                        (b"x-db-time-ms", f"{stats.seconds * 1000:.2f}".encode()),
+                    ]
+            await send(message)
+
+        token = current_query_stats.set(stats)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            current_query_stats.reset(token)
+
+        # Event streams stay open by design, so their duration is not a
+        # slow request.
+        elapsed = time.perf_counter() - started
+        if not streaming and elapsed * 1000 >= settings.SLOW_REQUEST_MS:
+            route = scope.get("route")
+            logger.warning(
+                "Slow request",
+                extra={
+                    "method": scope["method"],
+                    "path": scope["path"],
+                    "route": getattr(route, "path", None),
+                    "duration_ms": round(elapsed * 1000, 2),
+                    "db_queries": stats.count,
+                    "db_time_ms": round(stats.seconds * 1000, 2),
+                    "top_statement": next(iter(stats.shapes.most_common(1)), None),
+                },
+            )
@@ -1,7 +1,19 @@
 from uuid import UUID
-from fastapi import FastAPI, Request
+from fastapi import Depends, FastAPI, Request, Response
+from fastapi.datastructures import Default
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.database.db import Base, engine
+from app.database.db import (
+    Base,
+    SessionLocal,
+    create_missing_indexes,
+    engine,
+    get_async_db,
+    get_pool_stats,
+)
+from app.database.profiler import QueryProfilerMiddleware
 
 from app.routers.user_router import router as user_router
 from app.routers.auth_router import router as auth_router
@@ -10,14 +22,75 @@ from app.routers.menu_router import router as menu_router
 from app.routers.order_router import router as order_router
 from app.routers.payment_router import router as payment_router
 from app.routers.webhook_router import router as webhook_router
+from app.routers.health_router import router as health_router
 
+from app.core.cache import response_cache
+from app.core.metrics import MetricsMiddleware, StatsCollector, registry
+from app.core.principal_cache import principal_cache
+from app.core.responses import ORJSONResponse
+from app.core.revocation_cache import revoked_refresh_tokens
 from app.models.payment import Payment
+from app.services.bootstrap_service import mark_existing_admin_bootstrap
+from app.services.order_events import order_events
+from app.services.payment_gateway import payment_gateway
+from app.services.token_sweeper import reset_token_sweeper
+from app.services.webhook_worker import stripe_event_worker
+from app.utils.email import mail_queue
+from app.utils.google_auth import google_auth_client
+from app.utils.hash import hasher_pool
+from app.utils.logger import RequestIdMiddleware, log_pipeline, setup_logging
 
-app = FastAPI()
+setup_logging()
+
+# Wrapped in Default so routes with a response_model keep FastAPI's own
+# Pydantic-to-JSON path; plain dict responses are rendered with orjson.
+app = FastAPI(default_response_class=Default(ORJSONResponse))
+app.add_middleware(QueryProfilerMiddleware)
+app.add_middleware(MetricsMiddleware)
+app.add_middleware(RequestIdMiddleware)
+
+registry.register(StatsCollector("db_pool", get_pool_stats, label="pool"))
+for name, stats in {
+    "mail_queue": mail_queue.stats,
+    "password_hasher": hasher_pool.stats,
+    "webhook_worker": stripe_event_worker.stats,
+    "auth_cache": principal_cache.stats,
+    "response_cache": response_cache.stats,
+    "payment_gateway": payment_gateway.stats,
+    "logging": log_pipeline.stats,
+    "order_events": order_events.stats,
+    "google_auth": google_auth_client.stats,
+}.items():
+    registry.register(StatsCollector(name, stats))
 
 @app.on_event("startup")
-def on_startup():
+async def on_startup():
+    log_pipeline.start()
     Base.metadata.create_all(bind=engine)
+    create_missing_indexes(engine)
+    with SessionLocal() as db:
+        mark_existing_admin_bootstrap(db)
+    hasher_pool.start()
+    payment_gateway.start()
+    google_auth_client.start()
+    mail_queue.start()
+    stripe_event_worker.start()
+    reset_token_sweeper.start()
+    revoked_refresh_tokens.start()
+    await order_events.start()
+
+
+@app.on_event("shutdown")
+async def on_shutdown():
+    await order_events.stop()
+    await stripe_event_worker.stop()
+    await reset_token_sweeper.stop()
+    await revoked_refresh_tokens.stop()
+    mail_queue.stop()
+    hasher_pool.shutdown()
+    await payment_gateway.aclose()
+    await google_auth_client.aclose()
+    log_pipeline.stop()
 
 
 app.include_router(user_router)
@@ -27,8 +100,18 @@ app.include_router(menu_router)
 app.include_router(order_router)
 app.include_router(payment_router)
 app.include_router(webhook_router)
+app.include_router(health_router)
 
 
 @app.get("/")
-def home():
+async def home(db: AsyncSession = Depends(get_async_db)):
+    try:
+        await db.execute(text("SELECT 1"))
+    except Exception:
+        return ORJSONResponse({"message": "Database unavailable"}, status_code=503)
     return {"message": "Database connected!"}
+
+
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    return Response(generate_latest(registry), media_type=CONTENT_TYPE_LATEST)
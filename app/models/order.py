@@ -1,4 +1,4 @@
-from sqlalchemy import Column, ForeignKey, String, DateTime
+from sqlalchemy import Column, ForeignKey, String, DateTime, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 import uuid
@@ -7,6 +7,12 @@ from sqlalchemy import Numeric
 
 from app.database.db import Base
 
+ORDER_STATUSES = ("PLACED", "PAID", "PREPARING", "READY", "DELIVERED", "CANCELLED")
+
+# Orders a kitchen still has to act on. Everything else is history, which
+# the partial queue index below leaves out however large it grows.
+ACTIVE_ORDER_STATUSES = ("PLACED", "PAID", "PREPARING", "READY")
+
 
 class Order(Base):
     __tablename__ = "orders"
@@ -16,7 +22,7 @@ class Order(Base):
     restaurant_id = Column(
         UUID(as_uuid=True), ForeignKey("restaurants.id"), nullable=False
     )
-    status = Column(String, default="Placed")
+    status = Column(String, default=ORDER_STATUSES[0])
     total_amount = Column(Numeric(10, 2), default=0)
     created_at = Column(DateTime, default=datetime.utcnow)
     items = relationship(
@@ -24,3 +30,15 @@ class Order(Base):
     )
 
     user = relationship("User", back_populates="orders")
+
+    __table_args__ = (
+        Index("ix_orders_user_id_created_at_id", "user_id", "created_at", "id"),
+        Index(
+            "ix_orders_restaurant_active_queue",
+            "restaurant_id",
+            "created_at",
+            "id",
+            postgresql_where=status.in_(ACTIVE_ORDER_STATUSES),
+            sqlite_where=status.in_(ACTIVE_ORDER_STATUSES),
+        ),
+    )
@@ -10,7 +10,9 @@ class OrderItem(Base):
     __tablename__ = "order_items"
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    order_id = Column(UUID(as_uuid=True), ForeignKey("orders.id"), nullable=False)
+    order_id = Column(
+        UUID(as_uuid=True), ForeignKey("orders.id"), nullable=False, index=True
+    )
     menu_id = Column(UUID(as_uuid=True), ForeignKey("menus.id"), nullable=False)
     quantity = Column(Integer, nullable=False)
     price_at_order = Column(Float, nullable=False)
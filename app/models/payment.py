@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Float, ForeignKey, DateTime, JSON
+from sqlalchemy import Column, String, Float, ForeignKey, DateTime, JSON, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.sql import func
 import uuid
@@ -14,8 +14,12 @@ class Payment(Base):
     user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
     stripe_payment_intent_id = Column(String, nullable=True)
     stripe_session_id = Column(String, nullable=False, unique=True)
+    checkout_url = Column(String, nullable=True)
+    expires_at = Column(DateTime(timezone=True), nullable=True)
     amount = Column(Float, nullable=False)
     currency = Column(String, default="INR")
     status = Column(String, default="PENDING")
     stripe_response = Column(JSON)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    __table_args__ = (Index("ix_payments_order_id_status", "order_id", "status"),)
@@ -0,0 +1,22 @@
+from sqlalchemy import Column, String, Integer, DateTime, JSON, Index
+from sqlalchemy.sql import func
+
+from app.database.db import Base
+
+
+class StripeEvent(Base):
+    __tablename__ = "stripe_events"
+
+    id = Column(String, primary_key=True)
+    type = Column(String, nullable=False)
+    payload = Column(JSON, nullable=False)
+    status = Column(String, nullable=False, default="PENDING")
+    attempts = Column(Integer, nullable=False, default=0)
+    last_error = Column(String, nullable=True)
+    next_attempt_at = Column(DateTime(timezone=True), nullable=True)
+    received_at = Column(DateTime(timezone=True), server_default=func.now())
+    processed_at = Column(DateTime(timezone=True), nullable=True)
+
+    __table_args__ = (
+        Index("ix_stripe_events_status_received_at", "status", "received_at"),
+    )
@@ -1,11 +1,12 @@
 import uuid
-from sqlalchemy import Column, String, DateTime
+from sqlalchemy import Column, String
 from sqlalchemy.dialects.postgresql import UUID
-from datetime import datetime
 from sqlalchemy.orm import relationship
 
 from app.database.db import Base
 
+USER_ROLES = ("user", "partner", "admin")
+
 
 class User(Base):
     __tablename__ = "users"
@@ -16,9 +17,7 @@ class User(Base):
     email = Column(String, unique=True, nullable=False, index=True)
     phone = Column(String, nullable=False)
     password = Column(String, nullable=True)
-    role = Column(String, default="user")
+    role = Column(String, default=USER_ROLES[0])
     address = Column(String, nullable=True)
-    reset_token = Column(String, nullable=True)
-    reset_token_expiry = Column(DateTime, nullable=True)
 
     orders = relationship("Order", back_populates="user")
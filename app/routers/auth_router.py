@@ -1,59 +1,79 @@
-import requests
+import httpx
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi.security import OAuth2PasswordRequestForm
 from fastapi.responses import RedirectResponse
 from urllib.parse import urlencode
-from jose import jwt, JWTError
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 
-from app.database.db import get_db
+from app.database.db import get_async_db
+from app.models.password_reset_token import PasswordResetToken
 from app.models.user import User
 from app.schemas.user_schema import UserCreate, UserRead
 from app.schemas.auth_schema import Token, ForgotPasswordRequest, ResetPasswordRequest
-from app.utils.token import generate_reset_token
-from app.utils.hash import hash_password, verify_password
-from app.utils.google_auth import verify_google_token
-from app.core.config import settings
-from app.core.security import (
-    create_access_token,
-    create_refresh_token,
+from app.services.bootstrap_service import claim_admin_bootstrap
+from app.utils.email import send_password_reset_email
+from app.utils.token import generate_reset_token, hash_reset_token
+from app.utils.hash import (
+    hash_password_async,
+    verify_and_update_password_async,
 )
+from app.utils.google_auth import google_auth_client, verify_google_token
+from app.core.config import settings
+from app.core.security import create_access_token, role_claims
+from app.services import auth_service
 
 router = APIRouter(prefix="/auth", tags=["Auth"])
 
 
 @router.post("/register", response_model=UserRead)
-def register_user(payload: UserCreate, db: Session = Depends(get_db)):
-    is_first_user = db.query(User).count() == 0
+async def register_user(
+    payload: UserCreate,
+    db: AsyncSession = Depends(get_async_db),
+):
+    password = await hash_password_async(payload.password)
+    is_first_user = await claim_admin_bootstrap(db)
 
     user = User(
         first_name=payload.first_name,
         last_name=payload.last_name,
         email=payload.email,
         phone=payload.phone,
-        password=hash_password(payload.password),
+        password=password,
         role="admin" if is_first_user else "user",
         address=payload.address,
     )
 
     db.add(user)
-    db.commit()
-    db.refresh(user)
+    await db.commit()
+    await db.refresh(user)
     return user
 
 
 @router.post("/login", response_model=Token)
-def login(
+async def login(
     form_data: OAuth2PasswordRequestForm = Depends(),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
-    user = db.query(User).filter(User.email == form_data.username).first()
-    if not user or not verify_password(form_data.password, user.password):
+    user = await db.scalar(select(User).where(User.email == form_data.username))
+    if not user or not user.password:
+        raise HTTPException(status_code=401, detail="Invalid credentials")
+
+    valid, new_hash = await verify_and_update_password_async(
+        form_data.password, user.password
+    )
+    if not valid:
         raise HTTPException(status_code=401, detail="Invalid credentials")
 
-    access_token = create_access_token(data={"sub": str(user.id)})
-    refresh_token = create_refresh_token(data={"sub": str(user.id)})
+    if new_hash:
+        user.password = new_hash
+
+    access_token = create_access_token(
+        data={"sub": str(user.id), **role_claims(user.role)}
+    )
+    refresh_token = auth_service.issue_refresh_token(db, user.id, user.role)
+    await db.commit()
 
     return {
         "access_token": access_token,
@@ -63,77 +83,85 @@ def login(
 
 
 @router.post("/refresh")
-def refresh_access_token(refresh_token: str):
-    try:
-        payload = jwt.decode(
-            refresh_token,
-            settings.SECRET_KEY,
-            algorithms=[settings.ALGORITHM],
-        )
-
-        if payload.get("type") != "refresh":
-            raise HTTPException(status_code=401, detail="Invalid refresh token")
-
-        user_id = payload.get("sub")
-        if not user_id:
-            raise HTTPException(status_code=401, detail="Invalid refresh token")
-
-        new_access_token = create_access_token(data={"sub": user_id})
+async def refresh_access_token(
+    refresh_token: str,
+    db: AsyncSession = Depends(get_async_db),
+):
+    return await auth_service.refresh_tokens(db, refresh_token)
 
-        return {
-            "access_token": new_access_token,
-            "token_type": "bearer",
-        }
 
-    except JWTError:
-        raise HTTPException(status_code=401, detail="Refresh token expired or invalid")
+@router.post("/logout")
+async def logout(
+    refresh_token: str,
+    db: AsyncSession = Depends(get_async_db),
+):
+    return await auth_service.logout(db, refresh_token)
 
 
 @router.post("/forgot-password")
-def forgot_password(
+async def forgot_password(
     payload: ForgotPasswordRequest,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
-    user = db.query(User).filter(User.email == payload.email).first()
+    user = await db.scalar(select(User).where(User.email == payload.email))
 
     if not user:
         return {"message": "If account exists, reset link sent"}
 
     token = generate_reset_token()
-    user.reset_token = token
-    user.reset_token_expiry = datetime.utcnow() + timedelta(minutes=30)
 
-    db.commit()
+    # Only the latest link stays valid.
+    await db.execute(
+        delete(PasswordResetToken).where(PasswordResetToken.user_id == user.id)
+    )
+    db.add(
+        PasswordResetToken(
+            user_id=user.id,
+            token_hash=hash_reset_token(token),
+            expires_at=datetime.now(timezone.utc)
+            + timedelta(minutes=settings.PASSWORD_RESET_TOKEN_TTL_MINUTES),
+        )
+    )
 
-    print(f"RESET TOKEN for {user.email}: {token}")
+    await db.commit()
+
+    send_password_reset_email(user.email, token)
 
     return {"message": "Password reset link sent"}
 
 
 @router.post("/reset-password")
-def reset_password(
+async def reset_password(
     payload: ResetPasswordRequest,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
-    user = db.query(User).filter(User.reset_token == payload.token).first()
+    # Deleting the row is the redemption, so a token works exactly once
+    # even when two resets race.
+    user_id = await db.scalar(
+        delete(PasswordResetToken)
+        .where(
+            PasswordResetToken.token_hash == hash_reset_token(payload.token),
+            PasswordResetToken.expires_at > datetime.now(timezone.utc),
+        )
+        .returning(PasswordResetToken.user_id)
+    )
 
-    if not user:
+    if not user_id:
         raise HTTPException(400, "Invalid or expired token")
 
-    if user.reset_token_expiry < datetime.utcnow():
-        raise HTTPException(400, "Token expired")
+    user = await db.get(User, user_id)
+    if not user:
+        raise HTTPException(400, "Invalid or expired token")
 
-    user.password = hash_password(payload.new_password)
-    user.reset_token = None
-    user.reset_token_expiry = None
+    user.password = await hash_password_async(payload.new_password)
 
-    db.commit()
+    await db.commit()
 
     return {"message": "Password reset successful"}
 
 
 @router.get("/google/login")
-def google_login():
+async def google_login():
     params = {
         "client_id": settings.GOOGLE_CLIENT_ID,
         "redirect_uri": settings.GOOGLE_REDIRECT_URI,
@@ -148,51 +176,42 @@ def google_login():
 
 
 @router.get("/google/callback")
-def google_callback(
+async def google_callback(
     code: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
-    token_url = "https://oauth2.googleapis.com/token"
-
-    data = {
-        "code": code,
-        "client_id": settings.GOOGLE_CLIENT_ID,
-        "client_secret": settings.GOOGLE_CLIENT_SECRET,
-        "redirect_uri": settings.GOOGLE_REDIRECT_URI,
-        "grant_type": "authorization_code",
-    }
-
-    print(data, "=========")
-
-    token_response = requests.post(token_url, data=data)
-    token_json = token_response.json()
+    try:
+        token_json = await google_auth_client.exchange_code(code)
+    except httpx.HTTPStatusError:
+        raise HTTPException(401, "Google login failed")
 
     id_token = token_json.get("id_token")
     if not id_token:
         raise HTTPException(400, "Google login failed")
 
-    user_data = verify_google_token(id_token)
+    user_data = await verify_google_token(id_token)
 
     if not user_data:
         raise HTTPException(401, "Invalid Google token")
 
-    user = db.query(User).filter(User.email == user_data["email"]).first()
+    user = await db.scalar(select(User).where(User.email == user_data["email"]))
     if not user:
         user = User(
             email=user_data["email"],
             first_name=user_data["first_name"],
             last_name=user_data["last_name"],
-            password=hash_password("123456"),
+            password=await hash_password_async("123456"),
             phone="0000000000",
             role="user",
         )
 
         db.add(user)
-        db.commit()
-        db.refresh(user)
+        await db.commit()
+        await db.refresh(user)
 
-    access_token = create_access_token({"sub": str(user.id)})
-    refresh_token = create_refresh_token(data={"sub": str(user.id)})
+    access_token = create_access_token({"sub": str(user.id), **role_claims(user.role)})
+    refresh_token = auth_service.issue_refresh_token(db, user.id, user.role)
+    await db.commit()
 
     return {
         "access_token": access_token,
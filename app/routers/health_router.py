@@ -0,0 +1,76 @@
+from fastapi import APIRouter
+
+from app.core.cache import response_cache
+from app.core.principal_cache import principal_cache
+from app.core.revocation_cache import revoked_refresh_tokens
+from app.database.db import get_pool_stats
+from app.services.order_events import order_events
+from app.services.payment_gateway import payment_gateway
+from app.services.token_sweeper import reset_token_sweeper
+from app.services.webhook_worker import stripe_event_worker
+from app.utils.email import mail_queue
+from app.utils.google_auth import google_auth_client
+from app.utils.hash import hasher_pool
+from app.utils.logger import log_pipeline
+
+router = APIRouter(prefix="/health", tags=["Health"])
+
+
+@router.get("/db-pool")
+async def db_pool_stats():
+    return get_pool_stats()
+
+
+@router.get("/auth-cache")
+async def auth_cache_stats():
+    return principal_cache.stats()
+
+
+@router.get("/response-cache")
+async def response_cache_stats():
+    return response_cache.stats()
+
+
+@router.get("/password-hasher")
+async def password_hasher_stats():
+    return hasher_pool.stats()
+
+
+@router.get("/mail-queue")
+async def mail_queue_stats():
+    return mail_queue.stats()
+
+
+@router.get("/webhook-worker")
+async def webhook_worker_stats():
+    return stripe_event_worker.stats()
+
+
+@router.get("/payment-gateway")
+async def payment_gateway_stats():
+    return payment_gateway.stats()
+
+
+@router.get("/google-auth")
+async def google_auth_stats():
+    return google_auth_client.stats()
+
+
+@router.get("/reset-token-sweeper")
+async def reset_token_sweeper_stats():
+    return reset_token_sweeper.stats()
+
+
+@router.get("/refresh-revocations")
+async def refresh_revocation_stats():
+    return revoked_refresh_tokens.stats()
+
+
+@router.get("/logging")
+async def logging_stats():
+    return log_pipeline.stats()
+
+
+@router.get("/order-events")
+async def order_events_stats():
+    return order_events.stats()
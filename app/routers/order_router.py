@@ -1,103 +1,167 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.sse import EventSourceResponse
+from sqlalchemy import bindparam, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
 from uuid import UUID
 
-from app.database.db import get_db
-from app.models.order import Order
-from app.models.order_item import OrderItem
-from app.models.restaurant import Restaurant
-from app.models.menu import Menu
-from app.models.user import User
-from app.schemas.order_schema import OrderCreate, OrderRead, OrderStatusUpdate
-from app.core.security import get_current_user
+from app.database.db import AsyncSessionLocal, get_async_db
+from app.models.order import ACTIVE_ORDER_STATUSES, Order
+from app.schemas.order_schema import (
+    OrderBatchCreate,
+    OrderBatchResponse,
+    OrderCreate,
+    OrderPage,
+    OrderRead,
+    OrderStatusUpdate,
+)
+from app.core.principal_cache import UserSnapshot
+from app.core.responses import ORJSONResponse
+from app.core.security import (
+    AuthClaims,
+    get_current_user,
+    require_admin,
+    require_partner,
+)
+from app.schemas.serializers import order_serializer
+from app.services.order_events import (
+    order_events,
+    order_topic,
+    restaurant_topic,
+    status_event,
+)
+from app.services.order_service import place_order, place_orders_batch
+from app.utils.pagination import decode_cursor, encode_cursor
 
 router = APIRouter(prefix="/orders", tags=["Orders"])
 
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+EVENT_STREAM_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
 
-def admin_only(user: User):
-    if user.role.lower() != "admin":
-        raise HTTPException(403, "Admin access required")
+
+async def get_order_with_items(db: AsyncSession, order_id: UUID):
+    return await db.scalar(
+        select(Order).options(selectinload(Order.items)).where(Order.id == order_id)
+    )
 
 
 @router.post("/with-items", response_model=OrderRead)
-def place_order_with_items(
+async def place_order_with_items(
     payload: OrderCreate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserSnapshot = Depends(get_current_user),
+):
+    return await place_order(db, current_user.id, payload)
+
+
+@router.post("/batch", response_model=OrderBatchResponse)
+async def place_orders_in_batch(
+    payload: OrderBatchCreate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: AuthClaims = Depends(require_partner),
+):
+    return await place_orders_batch(db, current_user.id, payload.orders)
+
+
+@router.get("/restaurant/{restaurant_id}/queue", response_model=OrderPage)
+async def get_kitchen_queue(
+    restaurant_id: UUID,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: str | None = None,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: AuthClaims = Depends(require_partner),
 ):
-    restaurant = (
-        db.query(Restaurant).filter(Restaurant.id == payload.restaurant_id).first()
+    # The statuses are rendered inline so the planner can match the
+    # predicate of the partial queue index, including for prepared plans.
+    active = bindparam("active_statuses", ACTIVE_ORDER_STATUSES, literal_execute=True)
+    query = (
+        select(Order)
+        .options(selectinload(Order.items))
+        .where(Order.restaurant_id == restaurant_id, Order.status.in_(active))
+        .order_by(Order.created_at, Order.id)
+        .limit(limit + 1)
     )
 
-    if not restaurant:
-        raise HTTPException(404, "Restaurant not found")
+    if cursor:
+        try:
+            created_at, order_id = decode_cursor(cursor)
+        except ValueError:
+            raise HTTPException(400, "Invalid cursor")
 
-    for item in payload.items:
-        if not isinstance(item.quantity, int) or item.quantity <= 0:
-            raise HTTPException(400, "Quantity must be a positive integer")
+        query = query.where(tuple_(Order.created_at, Order.id) > (created_at, order_id))
 
-    menu_ids = [item.menu_id for item in payload.items]
+    orders = (await db.scalars(query)).all()
 
-    menu_items = (
-        db.query(Menu)
-        .filter(
-            Menu.id.in_(menu_ids),
-            Menu.restaurant_id == payload.restaurant_id,
-            Menu.is_available.is_(True),
-        )
-        .all()
+    next_cursor = None
+    if len(orders) > limit:
+        orders = orders[:limit]
+        last = orders[-1]
+        next_cursor = encode_cursor(last.created_at, last.id)
+
+    return ORJSONResponse(
+        {"items": order_serializer.to_list(orders), "next_cursor": next_cursor}
     )
 
-    if len(menu_items) != len(set(menu_ids)):
-        raise HTTPException(400, "Invalid or unavailable menu items")
 
-    order = Order(
-        user_id=current_user.id,
-        restaurant_id=payload.restaurant_id,
-        status="PLACED",
-        total_amount=0,
+@router.get("/restaurant/{restaurant_id}/events")
+async def stream_restaurant_order_events(
+    restaurant_id: UUID,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: AuthClaims = Depends(require_partner),
+):
+    # The stream can stay open for hours; give the pooled connection used
+    # by the auth check back before it starts.
+    await db.close()
+    return EventSourceResponse(
+        order_events.stream(restaurant_topic(restaurant_id)),
+        headers=EVENT_STREAM_HEADERS,
     )
-    db.add(order)
-    db.flush()
 
-    menu_map = {menu.id: menu for menu in menu_items}
-    total_amount = 0
 
-    for item in payload.items:
-        menu = menu_map[item.menu_id]
-        total_amount += menu.price * item.quantity
+@router.get("", response_model=OrderPage)
+async def get_my_orders(
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: str | None = None,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserSnapshot = Depends(get_current_user),
+):
+    query = (
+        select(Order)
+        .options(selectinload(Order.items))
+        .where(Order.user_id == current_user.id)
+        .order_by(Order.created_at.desc(), Order.id.desc())
+        .limit(limit + 1)
+    )
 
-        db.add(
-            OrderItem(
-                order_id=order.id,
-                menu_id=menu.id,
-                quantity=item.quantity,
-                price_at_order=menu.price,
-            )
-        )
+    if cursor:
+        try:
+            created_at, order_id = decode_cursor(cursor)
+        except ValueError:
+            raise HTTPException(400, "Invalid cursor")
 
-    order.total_amount = total_amount
-    db.commit()
-    db.refresh(order)
+        query = query.where(tuple_(Order.created_at, Order.id) < (created_at, order_id))
 
-    return order
+    orders = (await db.scalars(query)).all()
 
+    next_cursor = None
+    if len(orders) > limit:
+        orders = orders[:limit]
+        last = orders[-1]
+        next_cursor = encode_cursor(last.created_at, last.id)
 
-@router.get("", response_model=list[OrderRead])
-def get_my_orders(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
-):
-    return db.query(Order).filter(Order.user_id == current_user.id).all()
+    return ORJSONResponse(
+        {"items": order_serializer.to_list(orders), "next_cursor": next_cursor}
+    )
 
 
 @router.get("/{order_id}", response_model=OrderRead)
-def get_order_detail(
+async def get_order_detail(
     order_id: UUID,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserSnapshot = Depends(get_current_user),
 ):
-    order = db.query(Order).filter(Order.id == order_id).first()
+    order = await get_order_with_items(db, order_id)
 
     if not order:
         raise HTTPException(404, "Order not found")
@@ -105,24 +169,51 @@ def get_order_detail(
     if order.user_id != current_user.id and current_user.role.lower() != "admin":
         raise HTTPException(403, "Access denied")
 
-    return order
+    return ORJSONResponse(order_serializer.to_dict(order))
+
+
+@router.get("/{order_id}/events")
+async def stream_order_events(
+    order_id: UUID,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserSnapshot = Depends(get_current_user),
+):
+    order = await db.get(Order, order_id)
+    if not order:
+        raise HTTPException(404, "Order not found")
+
+    if order.user_id != current_user.id and current_user.role.lower() != "admin":
+        raise HTTPException(403, "Access denied")
+
+    await db.close()
+
+    async def snapshot():
+        async with AsyncSessionLocal() as session:
+            order = await session.get(Order, order_id)
+        if order is not None:
+            return status_event(order.id, order.restaurant_id, order.status)
+
+    return EventSourceResponse(
+        order_events.stream(order_topic(order_id), snapshot),
+        headers=EVENT_STREAM_HEADERS,
+    )
 
 
 @router.put("/{order_id}/status", response_model=OrderRead)
-def update_order_status(
+async def update_order_status(
     order_id: UUID,
     payload: OrderStatusUpdate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: AuthClaims = Depends(require_admin),
 ):
-    admin_only(current_user)
-
-    order = db.query(Order).filter(Order.id == order_id).first()
+    order = await get_order_with_items(db, order_id)
     if not order:
         raise HTTPException(404, "Order not found")
 
     order.status = payload.status
-    db.commit()
-    db.refresh(order)
+    await db.commit()
+    await order_events.publish(
+        [status_event(order.id, order.restaurant_id, order.status)]
+    )
 
     return order
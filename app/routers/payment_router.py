@@ -1,26 +1,65 @@
-import stripe
+from datetime import datetime, timedelta, timezone
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from sqlalchemy import func, or_, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 from uuid import UUID
 
-from app.database.db import get_db
-from app.models.order import Order
+from app.database.db import get_async_db
+from app.models.order import ORDER_STATUSES, Order
 from app.models.payment import Payment
-from app.models.user import User
+from app.core.principal_cache import UserSnapshot
 from app.core.security import get_current_user
-from app.core.config import settings
+from app.services.payment_gateway import (
+    GatewayUnavailable,
+    PaymentGatewayError,
+    payment_gateway,
+)
 
 router = APIRouter(prefix="/payments", tags=["Payments"])
-stripe.api_key = settings.STRIPE_SECRET_KEY
+
+# A session this close to expiry is not handed out again; the user would
+# likely land on an expired Stripe page.
+MIN_SESSION_REMAINING = timedelta(minutes=2)
+
+
+async def get_live_checkout(db: AsyncSession, order_id: UUID):
+    return await db.scalar(
+        select(Payment)
+        .where(
+            Payment.order_id == order_id,
+            Payment.status == "PENDING",
+            Payment.expires_at > datetime.now(timezone.utc) + MIN_SESSION_REMAINING,
+        )
+        .order_by(Payment.created_at.desc())
+        .limit(1)
+    )
+
+
+async def get_expiring_checkouts(db: AsyncSession, order_id: UUID) -> list[str]:
+    # PENDING sessions that are not handed out again but can still be paid
+    # on Stripe's side (rows without expires_at predate that column).
+    return (
+        await db.scalars(
+            select(Payment.stripe_session_id).where(
+                Payment.order_id == order_id,
+                Payment.status == "PENDING",
+                or_(
+                    Payment.expires_at.is_(None),
+                    Payment.expires_at > datetime.now(timezone.utc),
+                ),
+            )
+        )
+    ).all()
 
 
 @router.post("/create/{order_id}")
-def create_payment_checkout(
+async def create_payment_checkout(
     order_id: UUID,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserSnapshot = Depends(get_current_user),
 ):
-    order = db.query(Order).filter(Order.id == order_id).first()
+    order = await db.get(Order, order_id)
 
     if not order:
         raise HTTPException(404, "Order not found")
@@ -28,48 +67,100 @@ def create_payment_checkout(
     if order.user_id != current_user.id:
         raise HTTPException(403, "Not your order")
 
-    if order.status == "PAID":
-        raise HTTPException(400, "Order already paid")
-
-    session = stripe.checkout.Session.create(
-        mode="payment",
-        payment_method_types=["card"],
-        line_items=[
-            {
-                "price_data": {
-                    "currency": "inr",
-                    "product_data": {"name": f"Order {order.id}"},
-                    "unit_amount": int(order.total_amount * 100),
-                },
-                "quantity": 1,
-            }
-        ],
-        success_url=f"http://localhost:8000/payments/success/{order.id}",
-        cancel_url=f"http://localhost:8000/payments/cancel/{order.id}",
-        metadata={
-            "order_id": str(order.id),
-            "user_id": str(current_user.id),
-        },
+    if order.status != ORDER_STATUSES[0]:
+        raise HTTPException(400, f"Order is {order.status}, not awaiting payment")
+
+    live = await get_live_checkout(db, order_id)
+    if live:
+        return {"checkout_url": live.checkout_url}
+
+    expiring = await get_expiring_checkouts(db, order_id)
+
+    # Concurrent clicks see the same attempt number, so they send the same
+    # idempotency key (and identical parameters) and Stripe hands both of
+    # them the same session.
+    attempt = await db.scalar(
+        select(func.count()).select_from(Payment).where(Payment.order_id == order_id)
     )
+    amount = order.total_amount
+    now = datetime.now(timezone.utc)
+
+    # Release the pooled connection while waiting on the gateway.
+    await db.commit()
+
+    try:
+        # A session left open next to the new one could be paid as well, so
+        # each one is closed at Stripe before the next attempt is created.
+        for session_id in expiring:
+            expired = await payment_gateway.expire_checkout_session(session_id)
+            if expired.status == "complete":
+                raise HTTPException(409, "Payment for this order is being processed")
+
+        if expiring:
+            await db.execute(
+                update(Payment)
+                .where(
+                    Payment.stripe_session_id.in_(expiring),
+                    Payment.status == "PENDING",
+                )
+                .values(status="EXPIRED")
+            )
+            await db.commit()
+
+        session = await payment_gateway.create_checkout_session(
+            amount=int(amount * 100),
+            currency="inr",
+            name=f"Order {order_id}",
+            success_url=f"http://localhost:8000/payments/success/{order_id}",
+            cancel_url=f"http://localhost:8000/payments/cancel/{order_id}",
+            metadata={
+                "order_id": str(order_id),
+                "user_id": str(current_user.id),
+            },
+            idempotency_key=f"checkout:{order_id}:{attempt}",
+        )
+    except GatewayUnavailable as e:
+        raise HTTPException(503, str(e))
+    except PaymentGatewayError as e:
+        raise HTTPException(502, str(e))
 
     payment = Payment(
-        order_id=order.id,
+        order_id=order_id,
         user_id=current_user.id,
         stripe_session_id=session.id,
-        amount=order.total_amount,
+        checkout_url=session.url,
+        expires_at=session.expires_at,
+        amount=amount,
         currency="INR",
         status="PENDING",
-        stripe_response=session.to_dict(),
+        stripe_response=session.raw,
     )
 
+    await db.execute(
+        update(Payment)
+        .where(
+            Payment.order_id == order_id,
+            Payment.status == "PENDING",
+            Payment.expires_at <= now,
+        )
+        .values(status="EXPIRED")
+    )
     db.add(payment)
-    db.commit()
+
+    try:
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
+        live = await get_live_checkout(db, order_id)
+        if not live:
+            raise HTTPException(409, "Checkout already in progress, please retry")
+        return {"checkout_url": live.checkout_url}
 
     return {"checkout_url": session.url}
 
 
 @router.get("/success/{order_id}")
-def payment_success_page(order_id: UUID):
+async def payment_success_page(order_id: UUID):
 
     return {
         "message": "Payment successful",
@@ -79,7 +170,7 @@ def payment_success_page(order_id: UUID):
 
 
 @router.get("/cancel/{order_id}")
-def payment_cancel_page(order_id: UUID):
+async def payment_cancel_page(order_id: UUID):
     return {
         "message": "Payment cancelled",
         "order_id": str(order_id),
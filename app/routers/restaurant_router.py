@@ -1,91 +1,100 @@
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from uuid import UUID
 
 
-from app.database.db import get_db
+from app.database.db import get_async_db
 from app.models.restaurant import Restaurant
-from app.models.user import User
 from app.schemas.restaurant_schema import (
     RestaurantCreate,
     RestaurantUpdate,
     RestaurantRead,
 )
-from app.core.security import get_current_user
+from app.core.cache import (
+    RESTAURANT_LIST_KEY,
+    cached_json_response,
+    menus_key,
+    response_cache,
+    restaurant_key,
+)
+from app.core.security import AuthClaims, require_admin
+from app.schemas.serializers import restaurant_serializer
 
 router = APIRouter(prefix="/restaurants", tags=["Restaurants"])
 
 
-def admin_only(user: User):
-    if user.role.lower() != "admin":
-        raise HTTPException(status_code=403, detail="Admin access required")
-
-
 @router.post("", response_model=RestaurantRead)
-def create_restaurant(
+async def create_restaurant(
     payload: RestaurantCreate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: AuthClaims = Depends(require_admin),
 ):
-    admin_only(current_user)
-
     restaurant = Restaurant(**payload.dict())
     db.add(restaurant)
-    db.commit()
-    db.refresh(restaurant)
+    await db.commit()
+    await db.refresh(restaurant)
+    await response_cache.invalidate(RESTAURANT_LIST_KEY)
     return restaurant
 
 
 @router.get("", response_model=list[RestaurantRead])
-def list_restaurants(db: Session = Depends(get_db)):
-    return db.query(Restaurant).all()
+async def list_restaurants(db: AsyncSession = Depends(get_async_db)):
+    async def build():
+        result = await db.scalars(select(Restaurant))
+        return restaurant_serializer.dumps_list(result.all())
+
+    return await cached_json_response(RESTAURANT_LIST_KEY, build)
 
 
 @router.get("/{restaurant_id}", response_model=RestaurantRead)
-def get_restaurant(
+async def get_restaurant(
     restaurant_id: UUID,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
-    restaurant = db.query(Restaurant).filter(Restaurant.id == restaurant_id).first()
-    if not restaurant:
-        raise HTTPException(status_code=404, detail="Restaurant not found")
+    async def build():
+        restaurant = await db.get(Restaurant, restaurant_id)
+        if not restaurant:
+            raise HTTPException(status_code=404, detail="Restaurant not found")
 
-    return restaurant
+        return restaurant_serializer.dumps(restaurant)
+
+    return await cached_json_response(restaurant_key(restaurant_id), build)
 
 
 @router.put("/{restaurant_id}", response_model=RestaurantRead)
-def update_restaurant(
+async def update_restaurant(
     restaurant_id: UUID,
     payload: RestaurantUpdate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: AuthClaims = Depends(require_admin),
 ):
-    admin_only(current_user)
-
-    restaurant = db.query(Restaurant).filter(Restaurant.id == restaurant_id).first()
+    restaurant = await db.get(Restaurant, restaurant_id)
     if not restaurant:
         raise HTTPException(status_code=404, detail="Restaurant not found")
 
     for key, value in payload.dict(exclude_unset=True).items():
         setattr(restaurant, key, value)
 
-    db.commit()
-    db.refresh(restaurant)
+    await db.commit()
+    await db.refresh(restaurant)
+    await response_cache.invalidate(RESTAURANT_LIST_KEY, restaurant_key(restaurant_id))
     return restaurant
 
 
 @router.delete("/{restaurant_id}")
-def delete_restaurant(
+async def delete_restaurant(
     restaurant_id: UUID,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: AuthClaims = Depends(require_admin),
 ):
-    admin_only(current_user)
-
-    restaurant = db.query(Restaurant).filter(Restaurant.id == restaurant_id).first()
+    restaurant = await db.get(Restaurant, restaurant_id)
     if not restaurant:
         raise HTTPException(status_code=404, detail="Restaurant not found")
 
-    db.delete(restaurant)
-    db.commit()
+    await db.delete(restaurant)
+    await db.commit()
+    await response_cache.invalidate(
+        RESTAURANT_LIST_KEY, restaurant_key(restaurant_id), menus_key(restaurant_id)
+    )
     return {"message": "Restaurant deleted successfully"}
@@ -1,85 +1,111 @@
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from uuid import UUID
 
-from app.database.db import get_db
+from app.database.db import get_async_db
 from app.models.user import User
-from app.schemas.user_schema import UserRead, UserUpdate, UserProfile
-from app.core.security import get_current_user
+from app.schemas.user_schema import UserRead, UserUpdate, UserProfile, UserRoleUpdate
+from app.core.principal_cache import UserSnapshot, principal_cache
+from app.core.responses import ORJSONResponse
+from app.core.security import AuthClaims, get_current_user, require_admin
+from app.schemas.serializers import user_serializer
 from app.utils.hash import hash_password
 
 router = APIRouter(prefix="/users", tags=["Users"])
 
 
 @router.get("/profile", response_model=UserProfile)
-def get_profile(current_user: User = Depends(get_current_user)):
+async def get_profile(current_user: UserSnapshot = Depends(get_current_user)):
     return current_user
 
 
 @router.put("/profile", response_model=UserProfile)
-def update_profile(
+async def update_profile(
     payload: UserUpdate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserSnapshot = Depends(get_current_user),
 ):
+    user = await db.get(User, current_user.id)
+    if not user:
+        raise HTTPException(404, "User not found")
+
     if payload.first_name is not None:
-        current_user.first_name = payload.first_name
+        user.first_name = payload.first_name
 
     if payload.last_name is not None:
-        current_user.last_name = payload.last_name
+        user.last_name = payload.last_name
 
     if payload.phone is not None:
-        current_user.phone = payload.phone
+        user.phone = payload.phone
 
     if payload.address is not None:
-        current_user.address = payload.address
+        user.address = payload.address
 
-    db.commit()
-    db.refresh(current_user)
+    await db.commit()
+    await db.refresh(user)
+    principal_cache.invalidate_user(user.id)
 
-    return current_user
+    return user
 
 
 @router.get("", response_model=list[UserRead])
-def get_all_users(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+async def get_all_users(
+    db: AsyncSession = Depends(get_async_db),
+    current_user: AuthClaims = Depends(require_admin),
 ):
-    if current_user.role != "admin":
-        raise HTTPException(403, "Admin access required")
-
-    return db.query(User).all()
+    result = await db.scalars(select(User))
+    return ORJSONResponse(user_serializer.to_list(result.all()))
 
 
 @router.get("/{user_id}", response_model=UserRead)
-def get_user_by_id(
+async def get_user_by_id(
+    user_id: UUID,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: AuthClaims = Depends(require_admin),
+):
+    user = await db.get(User, user_id)
+    if not user:
+        raise HTTPException(404, "User not found")
+
+    return ORJSONResponse(user_serializer.to_dict(user))
+
+
+@router.put("/{user_id}/role", response_model=UserRead)
+async def update_user_role(
     user_id: UUID,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    payload: UserRoleUpdate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: AuthClaims = Depends(require_admin),
 ):
-    if current_user.role != "admin":
-        raise HTTPException(403, "Admin access required")
+    # Keeps an admin from locking the last admin account out by accident.
+    if user_id == current_user.id:
+        raise HTTPException(400, "Cannot change your own role")
 
-    user = db.query(User).filter(User.id == user_id).first()
+    user = await db.get(User, user_id)
     if not user:
         raise HTTPException(404, "User not found")
 
-    return user
+    user.role = payload.role
+    await db.commit()
+    # Tokens already issued keep their role claim until it is older than
+    # CLAIMS_AUTH_MAX_AGE_MINUTES; cached principals are dropped right away.
+    principal_cache.invalidate_user(user_id)
+
+    return ORJSONResponse(user_serializer.to_dict(user))
 
 
 @router.delete("/{user_id}")
-def delete_user(
+async def delete_user(
     user_id: UUID,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: AuthClaims = Depends(require_admin),
 ):
-    if current_user.role != "admin":
-        raise HTTPException(403, "Admin access required")
-
-    user = db.query(User).filter(User.id == user_id).first()
+    user = await db.get(User, user_id)
     if not user:
         raise HTTPException(404, "User not found")
 
-    db.delete(user)
-    db.commit()
+    await db.delete(user)
+    await db.commit()
+    principal_cache.invalidate_user(user_id)
     return {"message": "User deleted successfully"}
@@ -1,8 +1,10 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, field_validator
 from uuid import UUID
-from typing import List
+from typing import List, Literal, Optional
 from datetime import datetime
 
+from app.models.order import ORDER_STATUSES
+
 
 class OrderItemCreate(BaseModel):
     menu_id: UUID
@@ -25,7 +27,16 @@ class OrderCreate(BaseModel):
 
 
 class OrderStatusUpdate(BaseModel):
-    status: str
+    status: Literal[ORDER_STATUSES]
+
+    # Stored statuses are upper case; the kitchen queue and its partial
+    # index only match those, so "preparing" must not slip through as is.
+    @field_validator("status", mode="before")
+    @classmethod
+    def normalize_status(cls, value):
+        if isinstance(value, str):
+            return value.strip().upper()
+        return value
 
 
 class OrderRead(BaseModel):
@@ -39,3 +50,25 @@ class OrderRead(BaseModel):
 
     class Config:
         from_attributes = True
+
+
+class OrderPage(BaseModel):
+    items: List[OrderRead]
+    next_cursor: Optional[str] = None
+
+
+class OrderBatchCreate(BaseModel):
+    orders: List[OrderCreate] = Field(..., min_length=1, max_length=500)
+
+
+class OrderBatchResult(BaseModel):
+    index: int
+    status: str
+    order: Optional[OrderRead] = None
+    error: Optional[str] = None
+
+
+class OrderBatchResponse(BaseModel):
+    created: int
+    failed: int
+    results: List[OrderBatchResult]
@@ -0,0 +1,69 @@
+import types
+from operator import attrgetter
+from typing import Any, Callable, Iterable, Union, get_args, get_origin
+
+from pydantic import BaseModel
+
+from app.core.responses import dumps
+from app.schemas.menu_schema import MenuRead
+from app.schemas.order_schema import OrderRead
+from app.schemas.restaurant_schema import RestaurantRead
+from app.schemas.user_schema import UserRead
+
+
+def _unwrap_optional(annotation):
+    if get_origin(annotation) in (Union, types.UnionType):
+        args = [arg for arg in get_args(annotation) if arg is not type(None)]
+        if len(args) == 1:
+            return args[0]
+    return annotation
+
+
+class ModelSerializer:
+    # Rows loaded from our own database already satisfy the read schemas,
+    # so instead of validating every object through Pydantic the field list
+    # is read once from the schema and each row becomes a plain dict that
+    # orjson can write directly.
+    def __init__(self, schema: type[BaseModel]):
+        self.schema = schema
+        self.fields: list[tuple[str, Callable, Callable | None]] = [
+            (name, attrgetter(name), self._converter(field.annotation))
+            for name, field in schema.model_fields.items()
+        ]
+
+    @staticmethod
+    def _converter(annotation) -> Callable | None:
+        annotation = _unwrap_optional(annotation)
+        if get_origin(annotation) is list:
+            (item,) = get_args(annotation)
+            if isinstance(item, type) and issubclass(item, BaseModel):
+                return ModelSerializer(item).to_list
+        if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+            return ModelSerializer(annotation).to_dict
+        if annotation is float:
+            return float
+        return None
+
+    def to_dict(self, obj: Any) -> dict:
+        data = {}
+        for name, get, convert in self.fields:
+            value = get(obj)
+            if convert is not None and value is not None:
+                value = convert(value)
+            data[name] = value
+        return data
+
+    def to_list(self, objs: Iterable[Any]) -> list[dict]:
+        return [self.to_dict(obj) for obj in objs]
+
+    def dumps(self, obj: Any) -> bytes:
+        return dumps(self.to_dict(obj))
+
+    def dumps_list(self, objs: Iterable[Any]) -> bytes:
+        return dumps(self.to_list(objs))
+
+
+restaurant_serializer = ModelSerializer(RestaurantRead)
+menu_serializer = ModelSerializer(MenuRead)
+order_serializer = ModelSerializer(OrderRead)
+user_serializer = ModelSerializer(UserRead)
@@ -1,6 +1,8 @@
 from uuid import UUID
-from pydantic import BaseModel, EmailStr
-from typing import Optional
+from pydantic import BaseModel, EmailStr, field_validator
+from typing import Literal, Optional
+
+from app.models.user import USER_ROLES
 
 
 class UserCreate(BaseModel):
@@ -24,6 +26,17 @@ class UserUpdate(BaseModel):
     address: Optional[str] = None
 
 
+class UserRoleUpdate(BaseModel):
+    role: Literal[USER_ROLES]
+
+    @field_validator("role", mode="before")
+    @classmethod
+    def normalize_role(cls, value):
+        if isinstance(value, str):
+            return value.strip().lower()
+        return value
+
+
 class UserRead(BaseModel):
     id: UUID
     first_name: str
@@ -1,125 +1,212 @@
-from datetime import datetime, timedelta
+import uuid
+from datetime import datetime, timedelta, timezone
+from uuid import UUID
+
+from fastapi import HTTPException
 from jose import jwt, JWTError
-from sqlalchemy.orm import Session
-from fastapi import HTTPException, status
-from typing import Optional
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
 
-from app.schemas.auth_schema import TokenData
-from app.models.user import User
-from app.models.refresh_token import RefreshToken
 from app.core.config import settings
-from app.utils.hash import verify_password
-from app.services.log_service import create_log
-
-
-def create_access_token(data: dict) -> str:
-    now = datetime.utcnow()
-    expire = now + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
-
-    payload = {**data, "exp": expire, "iat": now}
-    token = jwt.encode(payload, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
-    return token
-
-
-def create_refresh_token(db: Session, user_id: str) -> str:
-    now = datetime.now()
-    expire = now + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
-
-    payload = {"sub": str(user_id), "exp": expire, "iat": now}
-    token_str = jwt.encode(payload, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
-
-    db_token = RefreshToken(
-        user_id=user_id,
-        token=token_str,
-        expires_at=expire,
-        revoked=False,
-    )
-    db.add(db_token)
-    db.commit()
-
-    return token_str
+from app.core.revocation_cache import revoked_refresh_tokens
+from app.core.security import create_access_token, create_refresh_token, role_claims
+from app.models.refresh_token import RefreshToken
+from app.models.user import User
 
 
-def decode_token(token: str) -> dict:
+def decode_refresh_token(token: str) -> dict:
     try:
         payload = jwt.decode(
             token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
         )
-        return payload
-
-    except jwt.ExpiredSignatureError:
-        raise HTTPException(401, "Token expired")
-
     except JWTError:
-        raise HTTPException(401, "Invalid token")
+        raise HTTPException(401, "Refresh token expired or invalid")
+
+    if payload.get("type") != "refresh":
+        raise HTTPException(401, "Invalid refresh token")
+
+    if not payload.get("sub") or not payload.get("jti") or not payload.get("fam"):
+        raise HTTPException(401, "Invalid refresh token")
+
+    return payload
+
+
+def issue_refresh_token(
+    db: AsyncSession,
+    user_id: UUID,
+    role: str,
+    family: UUID | None = None,
+    jti: str | None = None,
+) -> str:
+    # The row joins the caller's transaction; it is valid once committed.
+    jti = jti or uuid.uuid4().hex
+    family = family or uuid.uuid4()
+
+    db.add(
+        RefreshToken(
+            jti=jti,
+            user_id=user_id,
+            family=family,
+            expires_at=datetime.now(timezone.utc)
+            + timedelta(minutes=settings.REFRESH_TOKEN_EXPIRE_MINUTES),
+        )
+    )
 
+    return create_refresh_token(
+        data={
+            "sub": str(user_id),
+            "jti": jti,
+            "fam": str(family),
+            **role_claims(role),
+        }
+    )
 
-def authenticate_user(db: Session, email: str, password: str):
-    user = db.query(User).filter(User.email == email.lower().strip()).first()
 
-    if not user or not verify_password(password, user.password):
-        create_log(db, None, f"Login failed: {email}")
-        return None
+async def revoke_family(db: AsyncSession, family: UUID):
+    now = datetime.now(timezone.utc)
+    rows = await db.execute(
+        update(RefreshToken)
+        .where(RefreshToken.family == family, RefreshToken.revoked.is_(False))
+        .values(revoked=True, revoked_at=now)
+        .returning(RefreshToken.jti, RefreshToken.expires_at)
+    )
+    for jti, expires_at in rows:
+        revoked_refresh_tokens.add(jti, expires_at)
 
-    create_log(db, user.id, "Login successful")
-    return user
 
+async def is_revoked(db: AsyncSession, jti: str) -> bool:
+    if revoked_refresh_tokens.is_fresh():
+        return jti in revoked_refresh_tokens
 
-def login(db: Session, email: str, password: str):
-    user = authenticate_user(db, email, password)
-    if not user:
-        raise HTTPException(401, "Incorrect email or password")
+    revoked = await db.scalar(
+        select(RefreshToken.revoked).where(RefreshToken.jti == jti)
+    )
+    return revoked is None or revoked
 
-    access_token = create_access_token({"sub": str(user.id)})
-    refresh_token = create_refresh_token(db, user.id)
 
+def token_response(user_id: UUID, role: str, refresh_token: str) -> dict:
     return {
-        "access_token": access_token,
+        "access_token": create_access_token(
+            data={"sub": str(user_id), **role_claims(role)}
+        ),
         "refresh_token": refresh_token,
         "token_type": "bearer",
-        "user_id": str(user.id),
-        "role": user.role,
     }
 
 
-def refresh_access_token(db: Session, refresh_token: str):
-    payload = decode_token(refresh_token)
-    user_id = payload.get("sub")
+async def reissue_successor(db: AsyncSession, payload: dict) -> dict | None:
+    # Two tabs refreshing the same token race, and the loser finds it rotated
+    # moments ago. Within the grace window it gets the winner's successor
+    # instead of being treated as a replay.
+    now = datetime.now(timezone.utc)
+    successor = aliased(RefreshToken)
+    row = (
+        await db.execute(
+            select(RefreshToken.user_id, User.role, successor.jti)
+            .join(successor, successor.jti == RefreshToken.replaced_by)
+            .join(User, User.id == RefreshToken.user_id)
+            .where(
+                RefreshToken.jti == payload["jti"],
+                RefreshToken.revoked_at
+                >= now - timedelta(seconds=settings.REFRESH_TOKEN_REUSE_GRACE_SECONDS),
+                successor.revoked.is_(False),
+                successor.expires_at > now,
+            )
+        )
+    ).first()
+    if row is None:
+        return None
 
-    db_token = (
-        db.query(RefreshToken).filter(RefreshToken.token == refresh_token).first()
+    user_id, role, jti = row
+    refresh_token = create_refresh_token(
+        data={
+            "sub": str(user_id),
+            "jti": jti,
+            "fam": payload["fam"],
+            **role_claims(role),
+        }
     )
+    return token_response(user_id, role, refresh_token)
+
+
+async def reject_reuse(db: AsyncSession, payload: dict) -> dict:
+    tokens = await reissue_successor(db, payload)
+    if tokens is not None:
+        return tokens
+
+    # Any other rotated token coming back means it leaked; end every session
+    # that descends from the same login.
+    await revoke_family(db, UUID(payload["fam"]))
+    await db.commit()
+    raise HTTPException(401, "Refresh token revoked")
+
+
+async def refresh_tokens(db: AsyncSession, refresh_token: str) -> dict:
+    payload = decode_refresh_token(refresh_token)
+
+    if await is_revoked(db, payload["jti"]):
+        return await reject_reuse(db, payload)
+
+    issued_at = datetime.fromtimestamp(payload.get("iat", 0), tz=timezone.utc)
+    rotate_after = timedelta(minutes=settings.REFRESH_TOKEN_ROTATE_AFTER_MINUTES)
+    if datetime.now(timezone.utc) - issued_at < rotate_after:
+        # The role claim keeps its original role_at, so renewing from memory
+        # never extends how long a role is trusted without a lookup.
+        claims = {k: payload[k] for k in ("sub", "role", "role_at") if k in payload}
+        return {
+            "access_token": create_access_token(data=claims),
+            "token_type": "bearer",
+        }
+
+    now = datetime.now(timezone.utc)
+    successor = uuid.uuid4().hex
+    rotated = (
+        await db.execute(
+            update(RefreshToken)
+            .where(
+                RefreshToken.jti == payload["jti"],
+                RefreshToken.revoked.is_(False),
+                RefreshToken.expires_at > now,
+            )
+            .values(revoked=True, revoked_at=now, replaced_by=successor)
+            .returning(RefreshToken.user_id, RefreshToken.expires_at)
+        )
+    ).first()
 
-    if not db_token:
-        raise HTTPException(401, "Refresh token invalid")
+    # Lost the race to a concurrent rotation of the same token.
+    if rotated is None:
+        return await reject_reuse(db, payload)
 
-    if db_token.revoked:
-        raise HTTPException(401, "Refresh token revoked")
+    user_id, expires_at = rotated
+    revoked_refresh_tokens.add(payload["jti"], expires_at)
 
-    if db_token.expires_at < datetime.utcnow():
-        raise HTTPException(401, "Refresh token expired")
+    role = await db.scalar(select(User.role).where(User.id == user_id))
+    if role is None:
+        await db.rollback()
+        raise HTTPException(401, "Invalid refresh token")
 
-    db.delete(db_token)
-    db.commit()
+    new_refresh_token = issue_refresh_token(
+        db, user_id, role, UUID(payload["fam"]), jti=successor
+    )
+    await db.commit()
 
-    new_access = create_access_token({"sub": user_id})
-    new_refresh = create_refresh_token(db, user_id)
+    return token_response(user_id, role, new_refresh_token)
 
-    return {
-        "access_token": new_access,
-        "refresh_token": new_refresh,
-        "token_type": "bearer",
-        "user_id": user_id,
-    }
 
+async def logout(db: AsyncSession, refresh_token: str):
+    payload = decode_refresh_token(refresh_token)
 
-def logout(db: Session, refresh_token: str):
-    db_token = (
-        db.query(RefreshToken).filter(RefreshToken.token == refresh_token).first()
+    now = datetime.now(timezone.utc)
+    expires_at = await db.scalar(
+        update(RefreshToken)
+        .where(RefreshToken.jti == payload["jti"], RefreshToken.revoked.is_(False))
+        .values(revoked=True, revoked_at=now)
+        .returning(RefreshToken.expires_at)
     )
+    await db.commit()
 
-    if db_token:
-        db.delete(db_token)
-        db.commit()
+    if expires_at is not None:
+        revoked_refresh_tokens.add(payload["jti"], expires_at)
 
     return {"message": "Logged out successfully"}
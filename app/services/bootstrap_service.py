@@ -0,0 +1,44 @@
+from sqlalchemy import exists, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.database.db import insert_on_conflict
+from app.models.system_state import SystemState
+from app.models.user import User
+
+ADMIN_BOOTSTRAPPED = "admin_bootstrapped"
+
+
+async def claim_admin_bootstrap(db: AsyncSession) -> bool:
+    # Primary-key probe first, so once an admin exists no signup writes here.
+    claimed = await db.scalar(
+        select(exists().where(SystemState.key == ADMIN_BOOTSTRAPPED))
+    )
+    if claimed:
+        return False
+
+    # The claim commits or rolls back with the caller's user insert. A
+    # concurrent signup waits on the key and then inserts nothing.
+    won = await db.scalar(
+        insert_on_conflict(SystemState)
+        .values(key=ADMIN_BOOTSTRAPPED, value="register")
+        .on_conflict_do_nothing(index_elements=[SystemState.key])
+        .returning(SystemState.key)
+    )
+    return won is not None
+
+
+def mark_existing_admin_bootstrap(db: Session):
+    # Databases created before the flag existed already have their first
+    # user, who must not be followed by a second automatic admin.
+    if db.get(SystemState, ADMIN_BOOTSTRAPPED) is not None:
+        return
+    if db.scalar(select(exists().where(User.id.is_not(None)))):
+        # Every worker runs this on startup; the losers of the race insert
+        # nothing instead of failing on the primary key.
+        db.execute(
+            insert_on_conflict(SystemState)
+            .values(key=ADMIN_BOOTSTRAPPED, value="existing-users")
+            .on_conflict_do_nothing(index_elements=[SystemState.key])
+        )
+        db.commit()
@@ -0,0 +1,244 @@
+import asyncio
+import logging
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Awaitable, Callable
+from uuid import UUID
+
+import orjson
+from fastapi.sse import format_sse_event
+from sqlalchemy import func, select
+from sqlalchemy.engine import make_url
+
+from app.core.config import settings
+from app.core.responses import dumps
+from app.database.db import ASYNC_DATABASE_URL, async_engine
+
+logger = logging.getLogger(__name__)
+
+
+def order_topic(order_id) -> str:
+    return f"order:{order_id}"
+
+
+def restaurant_topic(restaurant_id) -> str:
+    return f"restaurant:{restaurant_id}"
+
+
+def status_event(order_id: UUID, restaurant_id: UUID, status: str) -> dict:
+    return {
+        "order_id": order_id,
+        "restaurant_id": restaurant_id,
+        "status": status,
+        "at": datetime.now(timezone.utc),
+    }
+
+
+class MemoryBackend:
+    # Single worker: publishing is delivery.
+    async def start(self, deliver: Callable[[str], None]):
+        self.deliver = deliver
+
+    async def stop(self):
+        pass
+
+    async def publish(self, payloads: list[str]):
+        for payload in payloads:
+            self.deliver(payload)
+
+    def stats(self) -> dict:
+        return {"backend": type(self).__name__}
+
+
+class PostgresBackend:
+    # Every worker LISTENs on one channel, so a change published by any
+    # worker reaches the subscribers connected to all of them. LISTEN needs
+    # a session-level connection, so behind PgBouncer in transaction mode
+    # point ORDER_EVENTS_LISTEN_URL at Postgres directly.
+    def __init__(self, url: str, channel: str, reconnect_delay: float):
+        try:
+            import asyncpg
+        except ImportError as e:
+            raise RuntimeError(
+                "ORDER_EVENTS_BACKEND=postgres requires the 'asyncpg' package"
+            ) from e
+
+        self._asyncpg = asyncpg
+        self.dsn = make_url(url).set(drivername="postgresql").render_as_string(
+            hide_password=False
+        )
+        self.channel = channel
+        self.reconnect_delay = reconnect_delay
+        self._task: asyncio.Task | None = None
+        self.connected = False
+        self.reconnects = 0
+
+    async def start(self, deliver: Callable[[str], None]):
+        self.deliver = deliver
+        if self._task is None:
+            self._task = asyncio.create_task(self._listen())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def publish(self, payloads: list[str]):
+        # NOTIFY goes through the regular pool; the payloads are small
+        # (well under the 8000 byte limit) and delivered on commit.
+        async with async_engine.begin() as conn:
+            for payload in payloads:
+                await conn.execute(select(func.pg_notify(self.channel, payload)))
+
+    def stats(self) -> dict:
+        return {
+            "backend": type(self).__name__,
+            "connected": self.connected,
+            "reconnects": self.reconnects,
+        }
+
+    def _on_notify(self, connection, pid, channel, payload):
+        self.deliver(payload)
+
+    async def _listen(self):
+        while True:
+            closed = asyncio.Event()
+            conn = None
+            try:
+                conn = await self._asyncpg.connect(self.dsn)
+                conn.add_termination_listener(lambda _: closed.set())
+                await conn.add_listener(self.channel, self._on_notify)
+                self.connected = True
+                await closed.wait()
+                logger.warning("Order event listener connection closed")
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Order event listener failed")
+            finally:
+                self.connected = False
+                if conn is not None and not conn.is_closed():
+                    await conn.close()
+
+            self.reconnects += 1
+            await asyncio.sleep(self.reconnect_delay)
+
+
+class OrderEventBroker:
+    # Fans order status changes out to the SSE streams connected to this
+    # worker. Each subscriber gets a bounded queue; a slow client loses its
+    # oldest pending events instead of holding memory or blocking others.
+    def __init__(self, backend, queue_size: int, keepalive: float):
+        self.backend = backend
+        self.queue_size = queue_size
+        self.keepalive = keepalive
+        self._subscribers: dict[str, set[asyncio.Queue]] = {}
+        self.published = 0
+        self.delivered = 0
+        self.dropped = 0
+
+    async def start(self):
+        await self.backend.start(self._deliver)
+
+    async def stop(self):
+        await self.backend.stop()
+        # Ends open streams so shutdown does not wait on idle clients.
+        for queues in self._subscribers.values():
+            for queue in queues:
+                self._put(queue, None)
+
+    @contextmanager
+    def subscribe(self, topic: str):
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        self._subscribers.setdefault(topic, set()).add(queue)
+        try:
+            yield queue
+        finally:
+            queues = self._subscribers.get(topic)
+            if queues is not None:
+                queues.discard(queue)
+                if not queues:
+                    del self._subscribers[topic]
+
+    async def publish(self, events: list[dict]):
+        # Called after the change is committed. A failed publish only costs
+        # clients a live update, so it never fails the request.
+        if not events:
+            return
+        try:
+            await self.backend.publish([dumps(event).decode() for event in events])
+            self.published += len(events)
+        except Exception:
+            logger.exception("Publishing order events failed")
+
+    async def stream(
+        self, topic: str, snapshot: Callable[[], Awaitable[dict | None]] | None = None
+    ):
+        # Subscribes before taking the snapshot so no change can fall in
+        # between them.
+        with self.subscribe(topic) as queue:
+            if snapshot is not None:
+                current = await snapshot()
+                if current is not None:
+                    yield format_sse_event(
+                        data_str=dumps(current).decode(), event="status"
+                    )
+
+            while True:
+                try:
+                    payload = await asyncio.wait_for(queue.get(), self.keepalive)
+                except asyncio.TimeoutError:
+                    yield format_sse_event(comment="ping")
+                    continue
+
+                if payload is None:
+                    return
+                yield format_sse_event(data_str=payload, event="status")
+
+    def stats(self) -> dict:
+        return {
+            **self.backend.stats(),
+            "topics": len(self._subscribers),
+            "subscribers": sum(len(queues) for queues in self._subscribers.values()),
+            "published": self.published,
+            "delivered": self.delivered,
+            "dropped": self.dropped,
+        }
+
+    def _put(self, queue: asyncio.Queue, payload: str | None):
+        if queue.full():
+            queue.get_nowait()
+            self.dropped += 1
+        queue.put_nowait(payload)
+
+    def _deliver(self, payload: str):
+        event = orjson.loads(payload)
+        for topic in (
+            order_topic(event["order_id"]),
+            restaurant_topic(event["restaurant_id"]),
+        ):
+            for queue in self._subscribers.get(topic, ()):
+                self._put(queue, payload)
+                self.delivered += 1
+
+
+def build_order_event_backend():
+    if settings.ORDER_EVENTS_BACKEND == "postgres":
+        return PostgresBackend(
+            settings.ORDER_EVENTS_LISTEN_URL or ASYNC_DATABASE_URL,
+            settings.ORDER_EVENTS_CHANNEL,
+            settings.ORDER_EVENTS_RECONNECT_SECONDS,
+        )
+
+    return MemoryBackend()
+
+
+order_events = OrderEventBroker(
+    build_order_event_backend(),
+    queue_size=settings.ORDER_EVENTS_QUEUE_SIZE,
+    keepalive=settings.ORDER_EVENTS_KEEPALIVE_SECONDS,
+)
@@ -0,0 +1,215 @@
+import uuid
+from collections import Counter
+
+from fastapi import HTTPException
+from sqlalchemy import and_, case, func, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.menu import Menu
+from app.models.order import Order
+from app.models.order_item import OrderItem
+from app.models.restaurant import Restaurant
+from app.schemas.order_schema import OrderCreate
+from app.services.order_events import order_events, status_event
+
+
+async def place_order(db: AsyncSession, user_id: uuid.UUID, payload: OrderCreate):
+    if not payload.items:
+        raise HTTPException(400, "Order must contain at least one item")
+
+    for item in payload.items:
+        if not isinstance(item.quantity, int) or item.quantity <= 0:
+            raise HTTPException(400, "Quantity must be a positive integer")
+
+    quantities = Counter()
+    for item in payload.items:
+        quantities[item.menu_id] += item.quantity
+
+    # One statement validates the restaurant, resolves every menu price and
+    # totals the order; the outer join keeps a row when no menu matches.
+    line_total = Menu.price * case(quantities, value=Menu.id, else_=0)
+    rows = (
+        await db.execute(
+            select(
+                Menu.id,
+                Menu.price,
+                func.coalesce(func.sum(line_total).over(), 0).label("total"),
+            )
+            .select_from(Restaurant)
+            .outerjoin(
+                Menu,
+                and_(
+                    Menu.restaurant_id == Restaurant.id,
+                    Menu.id.in_(list(quantities)),
+                    Menu.is_available.is_(True),
+                ),
+            )
+            .where(Restaurant.id == payload.restaurant_id)
+        )
+    ).all()
+
+    if not rows:
+        raise HTTPException(404, "Restaurant not found")
+
+    prices = {row.id: row.price for row in rows if row.id is not None}
+    if len(prices) != len(quantities):
+        raise HTTPException(400, "Invalid or unavailable menu items")
+
+    order_id = uuid.uuid4()
+    order = (
+        await db.execute(
+            insert(Order)
+            .values(
+                id=order_id,
+                user_id=user_id,
+                restaurant_id=payload.restaurant_id,
+                status="PLACED",
+                total_amount=rows[0].total,
+            )
+            .returning(
+                Order.id,
+                Order.user_id,
+                Order.restaurant_id,
+                Order.status,
+                Order.total_amount,
+                Order.created_at,
+            )
+        )
+    ).one()
+
+    items = (
+        await db.execute(
+            insert(OrderItem)
+            .values(
+                [
+                    {
+                        "id": uuid.uuid4(),
+                        "order_id": order_id,
+                        "menu_id": item.menu_id,
+                        "quantity": item.quantity,
+                        "price_at_order": prices[item.menu_id],
+                    }
+                    for item in payload.items
+                ]
+            )
+            .returning(
+                OrderItem.id,
+                OrderItem.menu_id,
+                OrderItem.quantity,
+                OrderItem.price_at_order,
+            )
+        )
+    ).all()
+
+    await db.commit()
+    await order_events.publish(
+        [status_event(order.id, order.restaurant_id, order.status)]
+    )
+
+    return {**order._asdict(), "items": [item._asdict() for item in items]}
+
+
+async def place_orders_batch(
+    db: AsyncSession, user_id: uuid.UUID, payloads: list[OrderCreate]
+):
+    restaurant_ids = {payload.restaurant_id for payload in payloads}
+    menu_ids = {item.menu_id for payload in payloads for item in payload.items}
+
+    rows = (
+        await db.execute(
+            select(Restaurant.id.label("restaurant_id"), Menu.id, Menu.price)
+            .select_from(Restaurant)
+            .outerjoin(
+                Menu,
+                and_(
+                    Menu.restaurant_id == Restaurant.id,
+                    Menu.id.in_(menu_ids),
+                    Menu.is_available.is_(True),
+                ),
+            )
+            .where(Restaurant.id.in_(restaurant_ids))
+        )
+    ).all()
+
+    menus_by_restaurant: dict[uuid.UUID, dict[uuid.UUID, float]] = {}
+    for row in rows:
+        prices = menus_by_restaurant.setdefault(row.restaurant_id, {})
+        if row.id is not None:
+            prices[row.id] = row.price
+
+    results = []
+    order_rows = []
+    item_rows = []
+
+    for index, payload in enumerate(payloads):
+        prices = menus_by_restaurant.get(payload.restaurant_id)
+        error = None
+
+        if prices is None:
+            error = "Restaurant not found"
+        elif not payload.items:
+            error = "Order must contain at least one item"
+        elif any(item.quantity <= 0 for item in payload.items):
+            error = "Quantity must be a positive integer"
+        elif any(item.menu_id not in prices for item in payload.items):
+            error = "Invalid or unavailable menu items"
+
+        if error:
+            results.append({"index": index, "status": "failed", "error": error})
+            continue
+
+        order_id = uuid.uuid4()
+        lines = [
+            {
+                "id": uuid.uuid4(),
+                "order_id": order_id,
+                "menu_id": item.menu_id,
+                "quantity": item.quantity,
+                "price_at_order": prices[item.menu_id],
+            }
+            for item in payload.items
+        ]
+        order_rows.append(
+            {
+                "id": order_id,
+                "user_id": user_id,
+                "restaurant_id": payload.restaurant_id,
+                "status": "PLACED",
+                "total_amount": sum(
+                    line["price_at_order"] * line["quantity"] for line in lines
+                ),
+            }
+        )
+        item_rows.extend(lines)
+        results.append({"index": index, "status": "created", "order": order_rows[-1]})
+
+    if order_rows:
+        created = await db.execute(
+            insert(Order).returning(
+                Order.id, Order.created_at, sort_by_parameter_order=True
+            ),
+            order_rows,
+        )
+        for order, row in zip(order_rows, created):
+            order["created_at"] = row.created_at
+            order["items"] = []
+
+        await db.execute(insert(OrderItem), item_rows)
+
+        orders_by_id = {order["id"]: order for order in order_rows}
+        for line in item_rows:
+            orders_by_id[line["order_id"]]["items"].append(line)
+
+        await db.commit()
+        await order_events.publish(
+            [
+                status_event(order["id"], order["restaurant_id"], order["status"])
+                for order in order_rows
+            ]
+        )
+
+    return {
+        "created": len(order_rows),
+        "failed": len(payloads) - len(order_rows),
+        "results": results,
+    }
@@ -0,0 +1,399 @@
+import asyncio
+import time
+import uuid
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+
+import httpx
+
+from app.core.config import settings
+from app.core.metrics import STRIPE_LATENCY
+
+
+class PaymentGatewayError(Exception):
+    pass
+
+
+class GatewayUnavailable(PaymentGatewayError):
+    pass
+
+
+@dataclass
+class CheckoutSession:
+    id: str
+    url: str
+    status: str
+    expires_at: datetime | None = None
+    raw: dict = field(default_factory=dict)
+
+    @classmethod
+    def from_stripe(cls, data: dict) -> "CheckoutSession":
+        expires_at = data.get("expires_at")
+        return cls(
+            id=data["id"],
+            url=data.get("url"),
+            status=data.get("status", "open"),
+            expires_at=(
+                datetime.fromtimestamp(expires_at, tz=timezone.utc)
+                if expires_at
+                else None
+            ),
+            raw=data,
+        )
+
+
+class CircuitBreaker:
+    def __init__(
+        self, failure_threshold: int, reset_timeout: float, half_open_max_calls: int
+    ):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.half_open_max_calls = half_open_max_calls
+        self.failures = 0
+        self.opened_at: float | None = None
+        self.probes = 0
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half_open"
+        return "open"
+
+    def before_call(self) -> bool:
+        # Returns whether this call is a half-open probe; the caller hands
+        # the slot back with release_probe() however the call ends.
+        state = self.state
+        if state == "closed":
+            return False
+        if state == "half_open" and self.probes < self.half_open_max_calls:
+            self.probes += 1
+            return True
+        raise GatewayUnavailable("Payment gateway temporarily unavailable")
+
+    def release_probe(self):
+        self.probes = max(self.probes - 1, 0)
+
+    def record_success(self):
+        self.failures = 0
+        self.opened_at = None
+
+    def record_failure(self):
+        self.failures += 1
+        if self.state == "half_open" or self.failures >= self.failure_threshold:
+            self.opened_at = time.monotonic()
+
+
+def stripe_form(data: dict, prefix: str = "") -> list[tuple[str, str]]:
+    pairs = []
+    for key, value in data.items():
+        name = f"{prefix}[{key}]" if prefix else key
+        if isinstance(value, dict):
+            pairs.extend(stripe_form(value, name))
+        elif isinstance(value, list):
+            for index, item in enumerate(value):
+                item_name = f"{name}[{index}]"
+                if isinstance(item, dict):
+                    pairs.extend(stripe_form(item, item_name))
+                else:
+                    pairs.append((item_name, str(item)))
+        elif isinstance(value, bool):
+            pairs.append((name, "true" if value else "false"))
+        elif value is not None:
+            pairs.append((name, str(value)))
+    return pairs
+
+
+class PaymentGateway(ABC):
+    @abstractmethod
+    async def create_checkout_session(
+        self,
+        *,
+        amount: int,
+        currency: str,
+        name: str,
+        success_url: str,
+        cancel_url: str,
+        metadata: dict,
+        expires_at: datetime | None = None,
+        idempotency_key: str | None = None,
+    ) -> CheckoutSession: ...
+
+    @abstractmethod
+    async def expire_checkout_session(self, session_id: str) -> CheckoutSession:
+        # Returns the session as it ended up: "expired", or "complete" if the
+        # customer paid before it could be expired.
+        ...
+
+    @abstractmethod
+    async def create_payment_intent(
+        self, *, amount: int, currency: str, metadata: dict
+    ) -> dict: ...
+
+    def stats(self) -> dict:
+        return {"gateway": type(self).__name__}
+
+    def start(self):
+        pass
+
+    async def aclose(self):
+        pass
+
+
+class StripeGateway(PaymentGateway):
+    RETRY_STATUSES = {409, 429, 500, 502, 503, 504}
+
+    def __init__(self):
+        self.max_retries = settings.STRIPE_MAX_RETRIES
+        self.breaker = CircuitBreaker(
+            failure_threshold=settings.STRIPE_CIRCUIT_FAILURE_THRESHOLD,
+            reset_timeout=settings.STRIPE_CIRCUIT_RESET_SECONDS,
+            half_open_max_calls=settings.STRIPE_CIRCUIT_HALF_OPEN_MAX_CALLS,
+        )
+        self._client: httpx.AsyncClient | None = None
+
+    def start(self):
+        # Built per lifespan: aclose() on shutdown leaves nothing behind
+        # that a later startup in the same process would reuse closed.
+        if self._client is None:
+            self._client = self._build_client()
+
+    def _build_client(self) -> httpx.AsyncClient:
+        return httpx.AsyncClient(
+            base_url=settings.STRIPE_API_BASE,
+            auth=(settings.STRIPE_SECRET_KEY, ""),
+            timeout=httpx.Timeout(
+                settings.STRIPE_TIMEOUT_SECONDS,
+                connect=settings.STRIPE_CONNECT_TIMEOUT_SECONDS,
+            ),
+            limits=httpx.Limits(
+                max_connections=settings.STRIPE_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.STRIPE_MAX_CONNECTIONS,
+            ),
+        )
+
+    async def _post(self, path: str, data: dict, idempotency_key: str | None = None):
+        # Stripe replays the original response for a repeated key, so every
+        # retry of one logical call is safe.
+        headers = {"Idempotency-Key": idempotency_key or str(uuid.uuid4())}
+        return await self._call("POST", path, dict(stripe_form(data)), headers)
+
+    async def _get(self, path: str):
+        return await self._call("GET", path, None, {})
+
+    async def _call(self, method: str, path: str, form: dict | None, headers: dict):
+        if self._client is None:
+            raise RuntimeError("Payment gateway is not started")
+
+        probe = self.breaker.before_call()
+        try:
+            return await self._send(method, path, form, headers)
+        finally:
+            if probe:
+                self.breaker.release_probe()
+
+    async def _send(self, method: str, path: str, form: dict | None, headers: dict):
+        for attempt in range(self.max_retries + 1):
+            started = time.perf_counter()
+            try:
+                response = await self._client.request(
+                    method, path, data=form, headers=headers
+                )
+            except httpx.TransportError as e:
+                STRIPE_LATENCY.labels(path, "transport_error").observe(
+                    time.perf_counter() - started
+                )
+                error = e
+            else:
+                STRIPE_LATENCY.labels(path, str(response.status_code)).observe(
+                    time.perf_counter() - started
+                )
+                if response.status_code not in self.RETRY_STATUSES:
+                    break
+                error = None
+
+            if attempt == self.max_retries:
+                self.breaker.record_failure()
+                if error is not None:
+                    raise GatewayUnavailable("Payment gateway unreachable") from error
+                raise GatewayUnavailable(
+                    f"Payment gateway error ({response.status_code})"
+                )
+
+            await asyncio.sleep(0.2 * 2**attempt)
+
+        self.breaker.record_success()
+        try:
+            body = response.json()
+        except ValueError:
+            body = None
+        if not isinstance(body, dict):
+            raise PaymentGatewayError(
+                f"Invalid response from payment gateway ({response.status_code})"
+            )
+
+        if response.status_code >= 400:
+            message = body.get("error", {}).get("message", "Payment gateway error")
+            raise PaymentGatewayError(message)
+
+        return body
+
+    async def create_checkout_session(
+        self,
+        *,
+        amount: int,
+        currency: str,
+        name: str,
+        success_url: str,
+        cancel_url: str,
+        metadata: dict,
+        expires_at: datetime | None = None,
+        idempotency_key: str | None = None,
+    ) -> CheckoutSession:
+        data = {
+            "mode": "payment",
+            "payment_method_types": ["card"],
+            "line_items": [
+                {
+                    "price_data": {
+                        "currency": currency,
+                        "product_data": {"name": name},
+                        "unit_amount": amount,
+                    },
+                    "quantity": 1,
+                }
+            ],
+            "success_url": success_url,
+            "cancel_url": cancel_url,
+            "metadata": metadata,
+            "expires_at": int(expires_at.timestamp()) if expires_at else None,
+        }
+        body = await self._post("/v1/checkout/sessions", data, idempotency_key)
+        return CheckoutSession.from_stripe(body)
+
+    async def expire_checkout_session(self, session_id: str) -> CheckoutSession:
+        path = f"/v1/checkout/sessions/{session_id}"
+        try:
+            body = await self._post(
+                f"{path}/expire", {}, idempotency_key=f"expire:{session_id}"
+            )
+        except GatewayUnavailable:
+            raise
+        except PaymentGatewayError:
+            # Stripe refuses to expire a session that is no longer open;
+            # read it back to learn whether it expired or was paid.
+            body = await self._get(path)
+        return CheckoutSession.from_stripe(body)
+
+    async def create_payment_intent(
+        self, *, amount: int, currency: str, metadata: dict
+    ) -> dict:
+        return await self._post(
+            "/v1/payment_intents",
+            {
+                "amount": amount,
+                "currency": currency,
+                "metadata": metadata,
+                "automatic_payment_methods": {"enabled": True},
+            },
+        )
+
+    def stats(self) -> dict:
+        return {
+            "gateway": type(self).__name__,
+            "circuit": self.breaker.state,
+            "consecutive_failures": self.breaker.failures,
+            "half_open_probes": self.breaker.probes,
+        }
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+class FakeGateway(PaymentGateway):
+    def __init__(self):
+        self.latency = settings.FAKE_GATEWAY_LATENCY_MS / 1000
+        self._sessions: dict[str, CheckoutSession] = {}
+
+    async def create_checkout_session(
+        self,
+        *,
+        amount: int,
+        currency: str,
+        name: str,
+        success_url: str,
+        cancel_url: str,
+        metadata: dict,
+        expires_at: datetime | None = None,
+        idempotency_key: str | None = None,
+    ) -> CheckoutSession:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+        if idempotency_key in self._sessions:
+            return self._sessions[idempotency_key]
+
+        session_id = f"cs_test_fake_{uuid.uuid4().hex}"
+        expires_at = expires_at or datetime.now(timezone.utc) + timedelta(hours=24)
+        session = CheckoutSession(
+            id=session_id,
+            url=f"{settings.FAKE_GATEWAY_CHECKOUT_URL}/{session_id}",
+            status="open",
+            expires_at=expires_at,
+            raw={
+                "id": session_id,
+                "object": "checkout.session",
+                "amount_total": amount,
+                "currency": currency,
+                "metadata": metadata,
+                "status": "open",
+                "expires_at": int(expires_at.timestamp()),
+            },
+        )
+        if idempotency_key:
+            self._sessions[idempotency_key] = session
+        return session
+
+    async def expire_checkout_session(self, session_id: str) -> CheckoutSession:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+        for session in self._sessions.values():
+            if session.id == session_id:
+                if session.status == "open":
+                    session.status = "expired"
+                return session
+
+        return CheckoutSession(
+            id=session_id, url=None, status="expired", raw={"id": session_id}
+        )
+
+    async def create_payment_intent(
+        self, *, amount: int, currency: str, metadata: dict
+    ) -> dict:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+        intent_id = f"pi_test_fake_{uuid.uuid4().hex}"
+        return {
+            "id": intent_id,
+            "object": "payment_intent",
+            "amount": amount,
+            "currency": currency,
+            "metadata": metadata,
+            "status": "requires_payment_method",
+            "client_secret": f"{intent_id}_secret_fake",
+        }
+
+
+def build_payment_gateway() -> PaymentGateway:
+    if settings.PAYMENT_GATEWAY == "fake":
+        return FakeGateway()
+    return StripeGateway()
+
+
+payment_gateway = build_payment_gateway()
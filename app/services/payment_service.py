@@ -1,17 +1,18 @@
-import stripe
 from fastapi import HTTPException
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.models.order import Order
-from app.core.config import settings
+from app.services.payment_gateway import (
+    GatewayUnavailable,
+    PaymentGatewayError,
+    payment_gateway,
+)
 
-stripe.api_key = settings.STRIPE_SECRET_KEY
 
-
-def create_stripe_payment_intent(
-    db: Session,
+async def create_stripe_payment_intent(
+    db: AsyncSession,
     order_id: str,
 ):
-    order = db.query(Order).filter(Order.id == order_id).first()
+    order = await db.get(Order, order_id)
 
     if not order:
         raise HTTPException(404, "Order not found")
@@ -21,13 +22,19 @@ def create_stripe_payment_intent(
 
     amount_in_paise = int(order.total_amount * 100)
 
-    intent = stripe.PaymentIntent.create(
-        amount=amount_in_paise,
-        currency="inr",
-        metadata={
-            "order_id": str(order.id),
-        },
-        automatic_payment_methods={"enabled": True},
-    )
+    await db.commit()
+
+    try:
+        intent = await payment_gateway.create_payment_intent(
+            amount=amount_in_paise,
+            currency="inr",
+            metadata={
+                "order_id": str(order.id),
+            },
+        )
+    except GatewayUnavailable as e:
+        raise HTTPException(503, str(e))
+    except PaymentGatewayError as e:
+        raise HTTPException(502, str(e))
 
     return intent
@@ -0,0 +1,82 @@
+import asyncio
+import logging
+from datetime import datetime, timezone
+
+from sqlalchemy import delete, select
+
+from app.core.config import settings
+from app.database.db import AsyncSessionLocal
+from app.models.password_reset_token import PasswordResetToken
+
+logger = logging.getLogger(__name__)
+
+
+class ResetTokenSweeper:
+    # Deletes in bounded batches, each in its own short transaction, so a
+    # large backlog never holds locks on the whole expired range.
+    def __init__(self, batch_size: int, interval: float):
+        self.batch_size = batch_size
+        self.interval = interval
+        self._task: asyncio.Task | None = None
+        self.purged = 0
+        self.runs = 0
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> dict:
+        return {
+            "running": self._task is not None,
+            "runs": self.runs,
+            "purged": self.purged,
+        }
+
+    async def _run(self):
+        while True:
+            try:
+                await self.sweep()
+            except Exception:
+                logger.exception("Reset token sweep failed")
+            await asyncio.sleep(self.interval)
+
+    async def sweep(self) -> int:
+        now = datetime.now(timezone.utc)
+        purged = 0
+
+        while True:
+            async with AsyncSessionLocal() as db:
+                expired = (
+                    select(PasswordResetToken.id)
+                    .where(PasswordResetToken.expires_at <= now)
+                    .limit(self.batch_size)
+                )
+                result = await db.execute(
+                    delete(PasswordResetToken).where(
+                        PasswordResetToken.id.in_(expired.scalar_subquery())
+                    )
+                )
+                await db.commit()
+
+            purged += result.rowcount
+            if result.rowcount < self.batch_size:
+                break
+
+        self.runs += 1
+        self.purged += purged
+        return purged
+
+
+reset_token_sweeper = ResetTokenSweeper(
+    batch_size=settings.RESET_TOKEN_SWEEP_BATCH_SIZE,
+    interval=settings.RESET_TOKEN_SWEEP_INTERVAL_SECONDS,
+)
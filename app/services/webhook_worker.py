@@ -0,0 +1,217 @@
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+from uuid import UUID
+
+from sqlalchemy import or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+
+from app.core.config import settings
+from app.database.db import AsyncSessionLocal
+from app.models.order import Order
+from app.models.payment import Payment
+from app.models.stripe_event import StripeEvent
+from app.services.order_events import order_events, status_event
+from app.utils.email import send_order_email
+
+logger = logging.getLogger(__name__)
+
+
+async def get_payment(db: AsyncSession, session: dict):
+    return await db.scalar(
+        select(Payment).where(Payment.stripe_session_id == session["id"])
+    )
+
+
+async def mark_paid(db: AsyncSession, session: dict, emails: list, events: list):
+    if session.get("payment_status") != "paid":
+        return
+
+    payment = await get_payment(db, session)
+    if not payment or payment.status == "SUCCESS":
+        return
+
+    order = await db.scalar(
+        select(Order)
+        .options(selectinload(Order.user))
+        .where(Order.id == UUID(session["metadata"]["order_id"]))
+    )
+    if not order:
+        return
+
+    payment.status = "SUCCESS"
+    order.status = "PAID"
+    events.append(status_event(order.id, order.restaurant_id, order.status))
+
+    if order.user and order.user.email:
+        emails.append(
+            {
+                "to_email": order.user.email,
+                "order_id": str(order.id),
+                "amount": payment.amount,
+            }
+        )
+
+
+def mark_payment(status: str):
+    async def handler(db: AsyncSession, session: dict, emails: list, events: list):
+        payment = await get_payment(db, session)
+        if payment and payment.status == "PENDING":
+            payment.status = status
+
+    return handler
+
+
+EVENT_HANDLERS = {
+    "checkout.session.completed": mark_paid,
+    "checkout.session.async_payment_succeeded": mark_paid,
+    "checkout.session.async_payment_failed": mark_payment("FAILED"),
+    "checkout.session.expired": mark_payment("EXPIRED"),
+}
+
+
+class StripeEventWorker:
+    def __init__(
+        self,
+        batch_size: int,
+        poll_interval: float,
+        max_attempts: int,
+        retry_delay: float,
+    ):
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self._wakeup: asyncio.Event | None = None
+        self._task: asyncio.Task | None = None
+        self.processed = 0
+        self.failed = 0
+
+    def start(self):
+        if self._task is None:
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def notify(self):
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    def stats(self) -> dict:
+        return {
+            "running": self._task is not None,
+            "processed": self.processed,
+            "failed": self.failed,
+        }
+
+    async def _run(self):
+        while True:
+            try:
+                handled = await self.process_batch()
+            except Exception:
+                logger.exception("Stripe event batch failed")
+                handled = 0
+
+            if handled < self.batch_size:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+
+    async def process_batch(self) -> int:
+        async with AsyncSessionLocal() as db:
+            # Each pass either commits the whole batch or stops at the first
+            # failing event. That event is recorded on its own and backed
+            # off, so the next pass claims the batch without it.
+            while True:
+                events = await self._claim(db)
+                emails = []
+                status_events = []
+                failed = None
+
+                for event in events:
+                    handler = EVENT_HANDLERS.get(event.type)
+                    try:
+                        async with db.begin_nested():
+                            if handler is not None:
+                                session = event.payload["data"]["object"]
+                                await handler(db, session, emails, status_events)
+                                await db.flush()
+                    except Exception as e:
+                        logger.exception(
+                            "Stripe event processing failed",
+                            extra={"event_id": event.id, "type": event.type},
+                        )
+                        failed = (event.id, e)
+                        break
+
+                    event.status = "PROCESSED" if handler is not None else "IGNORED"
+                    event.processed_at = datetime.now(timezone.utc)
+
+                if failed is None:
+                    await db.commit()
+                    break
+
+                # A failed flush can leave the batch transaction unusable, so
+                # the failure is written in a fresh one.
+                await db.rollback()
+                await self._record_failure(db, *failed)
+
+        self.processed += len(events)
+        await order_events.publish(status_events)
+        for email in emails:
+            send_order_email(**email)
+
+        return len(events)
+
+    async def _claim(self, db: AsyncSession) -> list[StripeEvent]:
+        return (
+            await db.scalars(
+                select(StripeEvent)
+                .where(
+                    StripeEvent.status == "PENDING",
+                    or_(
+                        StripeEvent.next_attempt_at.is_(None),
+                        StripeEvent.next_attempt_at <= datetime.now(timezone.utc),
+                    ),
+                )
+                .order_by(StripeEvent.received_at)
+                .limit(self.batch_size)
+                .with_for_update(skip_locked=True)
+            )
+        ).all()
+
+    async def _record_failure(self, db: AsyncSession, event_id: str, error: Exception):
+        event = await db.get(StripeEvent, event_id, with_for_update=True)
+        if event is None or event.status != "PENDING":
+            await db.rollback()
+            return
+
+        event.attempts += 1
+        event.last_error = str(error)[:500]
+        if event.attempts >= self.max_attempts:
+            event.status = "FAILED"
+            self.failed += 1
+        else:
+            event.next_attempt_at = datetime.now(timezone.utc) + timedelta(
+                seconds=self.retry_delay * 2 ** (event.attempts - 1)
+            )
+        await db.commit()
+
+
+stripe_event_worker = StripeEventWorker(
+    batch_size=settings.WEBHOOK_WORKER_BATCH_SIZE,
+    poll_interval=settings.WEBHOOK_WORKER_POLL_SECONDS,
+    max_attempts=settings.WEBHOOK_EVENT_MAX_ATTEMPTS,
+    retry_delay=settings.WEBHOOK_EVENT_RETRY_SECONDS,
+)
@@ -1,12 +1,17 @@
+import queue
 import smtplib
 import logging
+import threading
+import time
+from contextlib import contextmanager
 from email.message import EmailMessage
 from app.core.config import settings
+from app.core.metrics import SMTP_LATENCY
 
 logger = logging.getLogger(__name__)
 
 
-def send_order_email(to_email: str, order_id: str, amount: float):
+def build_order_email(to_email: str, order_id: str, amount: float) -> EmailMessage:
     msg = EmailMessage()
     msg["Subject"] = "Payment Successful – Order Confirmed"
     msg["From"] = settings.EMAIL_FROM
@@ -25,23 +30,230 @@ Thank you for ordering with us!
 Regards,
 Food Order System
 """)
+    return msg
+
 
+@contextmanager
+def observe_smtp(operation: str):
+    started = time.perf_counter()
+    outcome = "error"
     try:
-        with smtplib.SMTP(
-            settings.EMAIL_HOST, settings.EMAIL_PORT, timeout=10
-        ) as server:
-            server.starttls()
-            server.login(settings.EMAIL_USERNAME, settings.EMAIL_PASSWORD)
-            server.send_message(msg)
-
-        logger.info(
-            "Payment confirmation email sent",
-            extra={"order_id": order_id, "to": to_email},
-        )
-
-    except Exception as e:
-        logger.error(
-            "Failed to send payment email",
-            exc_info=e,
-            extra={"order_id": order_id, "to": to_email},
-        )
+        yield
+        outcome = "ok"
+    finally:
+        SMTP_LATENCY.labels(operation, outcome).observe(time.perf_counter() - started)
+
+
+def build_password_reset_email(to_email: str, token: str) -> EmailMessage:
+    msg = EmailMessage()
+    msg["Subject"] = "Reset your password"
+    msg["From"] = settings.EMAIL_FROM
+    msg["To"] = to_email
+
+    msg.set_content(f"""
+Hello,
+
+We received a request to reset your password. Use the link below within
+{settings.PASSWORD_RESET_TOKEN_TTL_MINUTES} minutes:
+
+{settings.PASSWORD_RESET_URL}?token={token}
+
+If you did not ask for this, you can ignore this email.
+
+Regards,
+Food Order System
+""")
+    return msg
+
+
+class MailQueue:
+    # Each sender thread owns one authenticated SMTP connection and keeps it
+    # open across batches, so a burst costs one handshake per thread.
+    def __init__(
+        self,
+        workers: int,
+        batch_size: int,
+        max_retries: int,
+        retry_backoff: float,
+        idle_timeout: float,
+        max_size: int,
+    ):
+        self.workers = workers
+        self.batch_size = batch_size
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self.idle_timeout = idle_timeout
+        self._queue: queue.Queue[EmailMessage] = queue.Queue(maxsize=max_size)
+        self._threads: list[threading.Thread] = []
+        self._stopping = threading.Event()
+        self._lock = threading.Lock()
+        self.sent = 0
+        self.failed = 0
+        self.retries = 0
+        self.dropped = 0
+        self.connections_opened = 0
+
+    def start(self):
+        if self._threads:
+            return
+
+        self._stopping.clear()
+        for index in range(self.workers):
+            thread = threading.Thread(
+                target=self._run, name=f"mail-sender-{index}", daemon=True
+            )
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self, timeout: float = 10):
+        self._stopping.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def enqueue(self, message: EmailMessage):
+        try:
+            self._queue.put_nowait(message)
+        except queue.Full:
+            self._count("dropped")
+            logger.error(
+                "Mail queue full, dropping email", extra={"to": message["To"]}
+            )
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "queue_depth": self._queue.qsize(),
+                "workers": len(self._threads),
+                "sent": self.sent,
+                "failed": self.failed,
+                "retries": self.retries,
+                "dropped": self.dropped,
+                "connections_opened": self.connections_opened,
+            }
+
+    def _count(self, name: str):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def _run(self):
+        conn = None
+        last_used = time.monotonic()
+
+        while not (self._stopping.is_set() and self._queue.empty()):
+            batch = self._next_batch()
+
+            if not batch:
+                idle = time.monotonic() - last_used
+                if conn is not None and idle > self.idle_timeout:
+                    conn = self._close(conn)
+                continue
+
+            for message in batch:
+                conn = self._deliver(conn, message)
+            last_used = time.monotonic()
+
+        self._close(conn)
+
+    def _next_batch(self) -> list[EmailMessage]:
+        try:
+            batch = [self._queue.get(timeout=1)]
+        except queue.Empty:
+            return []
+
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _deliver(self, conn, message: EmailMessage):
+        for attempt in range(self.max_retries + 1):
+            reused = conn is not None
+            try:
+                if conn is None:
+                    conn = self._connect()
+                with observe_smtp("send"):
+                    conn.send_message(message)
+                self._count("sent")
+                logger.debug("Email sent", extra={"to": message["To"]})
+                return conn
+
+            except smtplib.SMTPRecipientsRefused as e:
+                self._count("failed")
+                logger.error(
+                    "Email recipient refused", exc_info=e, extra={"to": message["To"]}
+                )
+                return conn
+
+            except (smtplib.SMTPException, OSError) as e:
+                conn = self._close(conn)
+                if attempt == self.max_retries:
+                    self._count("failed")
+                    logger.error(
+                        "Failed to send email", exc_info=e, extra={"to": message["To"]}
+                    )
+                    return None
+
+                self._count("retries")
+                # A kept-alive connection the server already dropped is not
+                # a delivery failure; reconnect straight away.
+                if not reused:
+                    time.sleep(self.retry_backoff * 2**attempt)
+
+            except Exception:
+                # Anything else (a bad header, an encoding error) would
+                # otherwise end this sender thread and silently stop mail.
+                # The connection may be mid-command, so start a new one.
+                self._count("failed")
+                logger.exception("Failed to send email", extra={"to": message["To"]})
+                return self._close(conn)
+
+        return conn
+
+    def _connect(self):
+        with observe_smtp("connect"):
+            conn = smtplib.SMTP(settings.EMAIL_HOST, settings.EMAIL_PORT, timeout=10)
+            try:
+                if settings.EMAIL_USE_TLS:
+                    conn.starttls()
+                if settings.EMAIL_USERNAME:
+                    conn.login(settings.EMAIL_USERNAME, settings.EMAIL_PASSWORD)
+            except Exception:
+                self._close(conn)
+                raise
+
+        self._count("connections_opened")
+        return conn
+
+    def _close(self, conn):
+        if conn is not None:
+            try:
+                conn.quit()
+            except (smtplib.SMTPException, OSError):
+                conn.close()
+        return None
+
+
+mail_queue = MailQueue(
+    workers=settings.EMAIL_SENDER_WORKERS,
+    batch_size=settings.EMAIL_BATCH_SIZE,
+    max_retries=settings.EMAIL_MAX_RETRIES,
+    retry_backoff=settings.EMAIL_RETRY_BACKOFF_SECONDS,
+    idle_timeout=settings.EMAIL_IDLE_TIMEOUT_SECONDS,
+    max_size=settings.EMAIL_QUEUE_MAX_SIZE,
+)
+
+
+def send_order_email(to_email: str, order_id: str, amount: float):
+    mail_queue.enqueue(build_order_email(to_email, order_id, amount))
+    logger.info(
+        "Payment confirmation email queued",
+        extra={"order_id": order_id, "to": to_email},
+    )
+
+
+def send_password_reset_email(to_email: str, token: str):
+    mail_queue.enqueue(build_password_reset_email(to_email, token))
+    logger.info("Password reset email queued", extra={"to": to_email})
@@ -1,13 +1,127 @@
-from google.oauth2 import id_token
-from google.auth.transport import requests
+import asyncio
+import re
+import time
+
+import httpx
+from google.auth import jwt as google_jwt
+from jose import jwt
+
 from app.core.config import settings
 
+GOOGLE_ISSUERS = {"accounts.google.com", "https://accounts.google.com"}
 
-def verify_google_token(token: str):
-    try:
-        idinfo = id_token.verify_oauth2_token(
-            token, requests.Request(), settings.GOOGLE_CLIENT_ID
+MAX_AGE_RE = re.compile(r"max-age=(\d+)")
+
+
+def cache_ttl(response: httpx.Response, default: float) -> float:
+    match = MAX_AGE_RE.search(response.headers.get("cache-control", ""))
+    if not match:
+        return default
+    age = int(response.headers.get("age", "0") or 0)
+    return max(int(match.group(1)) - age, 0)
+
+
+class GoogleAuthClient:
+    # Google rotates its signing keys rarely and publishes how long the
+    # current set may be cached, so a login only needs the token exchange.
+    def __init__(self):
+        self._client: httpx.AsyncClient | None = None
+        self._certs: dict[str, str] = {}
+        self._certs_expire_at = 0.0
+        self._certs_fetched_at = float("-inf")
+        self._lock: asyncio.Lock | None = None
+        self.cert_fetches = 0
+        self.cert_hits = 0
+
+    def start(self):
+        # The client and lock belong to the running loop, so both are made
+        # per lifespan; the cached certs are plain data and carry over.
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                timeout=httpx.Timeout(
+                    settings.GOOGLE_TIMEOUT_SECONDS,
+                    connect=settings.GOOGLE_CONNECT_TIMEOUT_SECONDS,
+                ),
+            )
+            self._lock = asyncio.Lock()
+
+    async def exchange_code(self, code: str) -> dict:
+        response = await self._client.post(
+            settings.GOOGLE_TOKEN_URL,
+            data={
+                "code": code,
+                "client_id": settings.GOOGLE_CLIENT_ID,
+                "client_secret": settings.GOOGLE_CLIENT_SECRET,
+                "redirect_uri": settings.GOOGLE_REDIRECT_URI,
+                "grant_type": "authorization_code",
+            },
+        )
+        response.raise_for_status()
+        return response.json()
+
+    async def get_certs(self, kid: str | None = None) -> dict[str, str]:
+        if self._is_fresh(kid):
+            self.cert_hits += 1
+            return self._certs
+
+        # Concurrent logins after expiry share one refresh.
+        async with self._lock:
+            if self._is_fresh(kid):
+                self.cert_hits += 1
+                return self._certs
+
+            response = await self._client.get(settings.GOOGLE_CERTS_URL)
+            response.raise_for_status()
+            self.cert_fetches += 1
+            self._certs = response.json()
+            self._certs_fetched_at = time.monotonic()
+            self._certs_expire_at = self._certs_fetched_at + cache_ttl(
+                response, settings.GOOGLE_CERTS_DEFAULT_TTL_SECONDS
+            )
+            return self._certs
+
+    def _is_fresh(self, kid: str | None) -> bool:
+        now = time.monotonic()
+        if now >= self._certs_expire_at:
+            return False
+        if kid is None or kid in self._certs:
+            return True
+        # An unknown key id may mean Google rotated early, but it is also
+        # what a forged token carries, so it refetches at most once per
+        # interval and otherwise fails verification against the cache.
+        return now - self._certs_fetched_at < settings.GOOGLE_CERTS_MIN_REFETCH_SECONDS
+
+    async def verify_id_token(self, token: str) -> dict:
+        kid = jwt.get_unverified_header(token).get("kid")
+        certs = await self.get_certs(kid)
+        idinfo = google_jwt.decode(
+            token, certs=certs, audience=settings.GOOGLE_CLIENT_ID
         )
+        if idinfo.get("iss") not in GOOGLE_ISSUERS:
+            raise ValueError("Wrong issuer")
+        return idinfo
+
+    def stats(self) -> dict:
+        return {
+            "cached_certs": len(self._certs),
+            "certs_ttl_seconds": max(self._certs_expire_at - time.monotonic(), 0),
+            "cert_fetches": self.cert_fetches,
+            "cert_hits": self.cert_hits,
+        }
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+            self._lock = None
+
+
+google_auth_client = GoogleAuthClient()
+
+
+async def verify_google_token(token: str):
+    try:
+        idinfo = await google_auth_client.verify_id_token(token)
 
         return {
             "email": idinfo["email"],
@@ -0,0 +1,208 @@
+import copy
+import json
+import logging
+import queue
+import random
+import sys
+import threading
+import uuid
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+
+from app.core.config import settings
+
+request_id_var: ContextVar[str | None] = ContextVar("request_id", default=None)
+
+SERVER_LOGGERS = ("uvicorn", "uvicorn.error", "uvicorn.access")
+
+RESERVED_ATTRS = set(
+    logging.LogRecord("", 0, "", 0, "", (), None).__dict__
+) | {"message", "asctime", "request_id", "color_message"}
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        if record.request_id:
+            entry["request_id"] = record.request_id
+
+        for key, value in record.__dict__.items():
+            if key not in RESERVED_ATTRS:
+                entry[key] = value
+
+        if record.exc_text:
+            entry["exc"] = record.exc_text
+
+        return json.dumps(entry, default=str)
+
+
+class TextFormatter(logging.Formatter):
+    def __init__(self):
+        super().__init__(
+            "%(asctime)s %(levelname)s %(name)s [%(request_id)s] %(message)s"
+        )
+
+
+class ContextFilter(logging.Filter):
+    # Runs in the caller's thread while the request context is still set;
+    # the writer thread only ever sees the copied value.
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = request_id_var.get()
+        return True
+
+
+class DebugSampler(logging.Filter):
+    def __init__(self, rate: float):
+        super().__init__()
+        self.rate = rate
+        self.sampled_out = 0
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > logging.DEBUG or random.random() < self.rate:
+            return True
+        self.sampled_out += 1
+        return False
+
+
+class NonBlockingQueueHandler(QueueHandler):
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Resolve everything that depends on the caller's state now, but
+        # leave JSON encoding and the write to the listener thread. Works on
+        # a copy, like the stdlib handler, so other handlers on the same
+        # record still see the original msg, args and exc_info.
+        message = record.getMessage()
+        record = copy.copy(record)
+        record.msg = message
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class DrainingQueueListener(QueueListener):
+    def enqueue_sentinel(self):
+        # The stdlib uses put_nowait, which raises queue.Full on a full
+        # bounded queue. The listener thread is still draining here, so a
+        # blocking put gets its slot once the backlog is written.
+        self.queue.put(self._sentinel)
+
+
+class LogPipeline:
+    # Request code only appends to an in-memory queue; a single listener
+    # thread formats and writes to stdout, so a slow terminal or log
+    # collector never stalls a request.
+    def __init__(
+        self, level: str, json_output: bool, debug_sample_rate: float, max_size: int
+    ):
+        self.queue: queue.Queue = queue.Queue(maxsize=max_size)
+        self.handler = NonBlockingQueueHandler(self.queue)
+        self.sampler = DebugSampler(debug_sample_rate)
+        self.handler.addFilter(self.sampler)
+        self.handler.addFilter(ContextFilter())
+
+        output = logging.StreamHandler(sys.stdout)
+        output.setFormatter(JsonFormatter() if json_output else TextFormatter())
+        self.listener = DrainingQueueListener(self.queue, output)
+        self.level = level
+        self._lock = threading.Lock()
+        self._running = False
+
+    def install(self):
+        root = logging.getLogger()
+        root.setLevel(self.level)
+        for handler in list(root.handlers):
+            root.removeHandler(handler)
+        root.addHandler(self.handler)
+
+        # uvicorn gives its loggers their own stream handlers and stops them
+        # propagating, before the app is imported. Handing them back to the
+        # root sends server and access lines through the queue as well.
+        for name in SERVER_LOGGERS:
+            logger = logging.getLogger(name)
+            for handler in list(logger.handlers):
+                logger.removeHandler(handler)
+            logger.setLevel(logging.NOTSET)
+            logger.propagate = True
+
+    def start(self):
+        with self._lock:
+            if not self._running:
+                self.listener.start()
+                self._running = True
+
+    def stop(self):
+        # Drains what is already queued before returning.
+        with self._lock:
+            if self._running:
+                self.listener.stop()
+                self._running = False
+
+    def stats(self) -> dict:
+        return {
+            "running": self._running,
+            "queue_depth": self.queue.qsize(),
+            "dropped": self.handler.dropped,
+            "debug_sampled_out": self.sampler.sampled_out,
+        }
+
+
+log_pipeline = LogPipeline(
+    level=settings.LOG_LEVEL,
+    json_output=settings.LOG_JSON,
+    debug_sample_rate=settings.LOG_DEBUG_SAMPLE_RATE,
+    max_size=settings.LOG_QUEUE_MAX_SIZE,
+)
+
+
+def setup_logging():
+    log_pipeline.install()
+    log_pipeline.start()
+
+
+class RequestIdMiddleware:
+    def __init__(self, app, header: str = "x-request-id"):
+        self.app = app
+        self.header = header.encode()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = None
+        for name, value in scope["headers"]:
+            if name == self.header:
+                request_id = value.decode("latin-1")[:128]
+                break
+        request_id = request_id or uuid.uuid4().hex
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = [
+                    *message.get("headers", []),
+                    (self.header, request_id.encode("latin-1")),
+                ]
+            await send(message)
+
+        token = request_id_var.set(request_id)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            request_id_var.reset(token)
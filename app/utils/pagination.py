@@ -0,0 +1,19 @@
+import base64
+from datetime import datetime
+from uuid import UUID
+
+
+def encode_cursor(created_at: datetime, row_id: UUID) -> str:
+    raw = f"{created_at.isoformat()}|{row_id}".encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, UUID]:
+    padded = cursor + "=" * (-len(cursor) % 4)
+    try:
+        created_at, row_id = (
+            base64.urlsafe_b64decode(padded.encode("ascii")).decode("utf-8").split("|")
+        )
+        return datetime.fromisoformat(created_at), UUID(row_id)
+    except (ValueError, UnicodeError):
+        raise ValueError("Invalid cursor")
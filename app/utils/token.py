@@ -1,5 +1,10 @@
+import hashlib
 import secrets
 
 
 def generate_reset_token() -> str:
     return secrets.token_urlsafe(32)
+
+
+def hash_reset_token(token: str) -> str:
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
@@ -0,0 +1,76 @@
+"""Compare two benchmark results and fail on latency regressions.
+
+    python -m benchmarks.compare baseline.json candidate.json --threshold 10
+"""
+
+import argparse
+import sys
+
+from benchmarks.report import load_result
+
+METRICS = ("p50_ms", "p95_ms", "p99_ms")
+
+
+def change(base: float, new: float) -> float:
+    if not base:
+        return 0.0
+    return (new - base) / base * 100
+
+
+def compare(base: dict, new: dict, threshold: float, metric: str) -> list[str]:
+    regressions = []
+    header = f"{'route':<40} " + " ".join(f"{m:>20}" for m in METRICS) + f" {'rps':>18}"
+    print(header)
+    print("-" * len(header))
+
+    for route in sorted(set(base["routes"]) | set(new["routes"])):
+        old_stats = base["routes"].get(route)
+        new_stats = new["routes"].get(route)
+        if old_stats is None or new_stats is None:
+            print(f"{route:<40} only in {'candidate' if old_stats is None else 'baseline'}")
+            continue
+
+        cells = []
+        for name in METRICS:
+            delta = change(old_stats[name], new_stats[name])
+            cells.append(f"{new_stats[name]:>9.2f} ({delta:+6.1f}%)")
+        rps_delta = change(old_stats["rps"], new_stats["rps"])
+        print(
+            f"{route:<40} " + " ".join(cells)
+            + f" {new_stats['rps']:>8.1f} ({rps_delta:+6.1f}%)"
+        )
+
+        if change(old_stats[metric], new_stats[metric]) > threshold:
+            regressions.append(route)
+        if new_stats["errors"] > old_stats["errors"]:
+            regressions.append(f"{route} (errors {old_stats['errors']} -> {new_stats['errors']})")
+
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("baseline")
+    parser.add_argument("candidate")
+    parser.add_argument(
+        "--threshold", type=float, default=10, help="Allowed slowdown in percent"
+    )
+    parser.add_argument("--metric", choices=METRICS, default="p95_ms")
+    args = parser.parse_args()
+
+    regressions = compare(
+        load_result(args.baseline),
+        load_result(args.candidate),
+        args.threshold,
+        args.metric,
+    )
+
+    if regressions:
+        print(f"\n{args.metric} regressed by more than {args.threshold}%:")
+        for route in regressions:
+            print(f"  {route}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
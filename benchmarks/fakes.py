@@ -0,0 +1,180 @@
+import hashlib
+import hmac
+import json
+import socketserver
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+
+from cryptography import x509
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from cryptography.x509.oid import NameOID
+from jose import jwt
+
+GOOGLE_KEY_ID = "bench-key"
+
+
+class SMTPHandler(socketserver.StreamRequestHandler):
+    # Just enough of RFC 5321 for smtplib: no TLS, no auth, accept all mail.
+    def reply(self, line: str):
+        self.wfile.write(f"{line}\r\n".encode())
+
+    def handle(self):
+        self.reply("220 bench ESMTP")
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+
+            command = line.decode(errors="replace").strip().upper()
+            if command.startswith(("EHLO", "HELO")):
+                self.reply("250 bench")
+            elif command == "DATA":
+                self.reply("354 End data with <CR><LF>.<CR><LF>")
+                while self.rfile.readline() not in (b".\r\n", b".\n", b""):
+                    pass
+                self.server.delivered += 1
+                self.reply("250 OK")
+            elif command == "QUIT":
+                self.reply("221 Bye")
+                return
+            else:
+                self.reply("250 OK")
+
+
+class StubSMTPServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0):
+        super().__init__((host, port), SMTPHandler)
+        self.delivered = 0
+
+    @property
+    def port(self) -> int:
+        return self.server_address[1]
+
+    def start(self):
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+
+class GoogleKeys:
+    def __init__(self, client_id: str):
+        self.client_id = client_id
+        self.key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+        self.private_pem = self.key.private_bytes(
+            serialization.Encoding.PEM,
+            serialization.PrivateFormat.PKCS8,
+            serialization.NoEncryption(),
+        )
+
+        name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "bench")])
+        now = datetime.now(timezone.utc)
+        cert = (
+            x509.CertificateBuilder()
+            .subject_name(name)
+            .issuer_name(name)
+            .public_key(self.key.public_key())
+            .serial_number(x509.random_serial_number())
+            .not_valid_before(now - timedelta(minutes=5))
+            .not_valid_after(now + timedelta(days=1))
+            .sign(self.key, hashes.SHA256())
+        )
+        self.certs = {
+            GOOGLE_KEY_ID: cert.public_bytes(serialization.Encoding.PEM).decode()
+        }
+
+    def id_token(self, email: str) -> str:
+        now = int(time.time())
+        return jwt.encode(
+            {
+                "iss": "https://accounts.google.com",
+                "aud": self.client_id,
+                "iat": now,
+                "exp": now + 3600,
+                "email": email,
+                "given_name": "Bench",
+                "family_name": "User",
+            },
+            self.private_pem,
+            algorithm="RS256",
+            headers={"kid": GOOGLE_KEY_ID},
+        )
+
+
+class FakeGoogleServer(ThreadingHTTPServer):
+    # Serves /token and /certs. The authorization code is used as the email
+    # of the account being signed in.
+    daemon_threads = True
+
+    def __init__(self, keys: GoogleKeys, host: str = "127.0.0.1", port: int = 0):
+        super().__init__((host, port), FakeGoogleHandler)
+        self.keys = keys
+        self.token_requests = 0
+        self.cert_requests = 0
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+
+class FakeGoogleHandler(BaseHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+    def send_json(self, body: dict, headers: dict | None = None):
+        data = json.dumps(body).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        self.server.cert_requests += 1
+        self.send_json(
+            self.server.keys.certs, {"Cache-Control": "public, max-age=3600"}
+        )
+
+    def do_POST(self):
+        self.server.token_requests += 1
+        length = int(self.headers.get("Content-Length", 0))
+        form = parse_qs(self.rfile.read(length).decode())
+        email = form.get("code", ["bench@example.com"])[0]
+        self.send_json({"id_token": self.server.keys.id_token(email)})
+
+
+def sign_stripe_payload(payload: bytes, secret: str) -> str:
+    timestamp = int(time.time())
+    signed = f"{timestamp}.".encode() + payload
+    signature = hmac.new(secret.encode(), signed, hashlib.sha256).hexdigest()
+    return f"t={timestamp},v1={signature}"
+
+
+def checkout_completed_event(event_id: str, session_id: str, order_id: str) -> bytes:
+    return json.dumps(
+        {
+            "id": event_id,
+            "object": "event",
+            "type": "checkout.session.completed",
+            "data": {
+                "object": {
+                    "id": session_id,
+                    "object": "checkout.session",
+                    "payment_status": "paid",
+                    "metadata": {"order_id": order_id},
+                }
+            },
+        }
+    ).encode()
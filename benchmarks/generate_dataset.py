@@ -0,0 +1,317 @@
+"""Seed a database with a large, skewed synthetic dataset.
+
+    python -m benchmarks.generate_dataset --database-url postgresql://... --orders 10000000
+    python -m benchmarks.generate_dataset --database-url sqlite:///scale.db --orders 200000
+
+A few restaurants and users receive most of the orders (Zipf-like weights
+controlled by --restaurant-skew and --user-skew), so both the hot and the
+long-tail paths of list and history endpoints can be measured. Postgres is
+loaded with COPY, other databases with multi-row INSERTs.
+
+Run it against an empty database. Every generated user has the password
+given by --password, and user0@example.com is the admin.
+"""
+
+import argparse
+import csv
+import io
+import itertools
+import json
+import random
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from benchmarks import settings
+
+ORDER_STATUSES = {
+    "DELIVERED": 55,
+    "PAID": 15,
+    "PLACED": 15,
+    "PREPARING": 5,
+    "CANCELLED": 10,
+}
+PAID_STATUSES = {"DELIVERED", "PAID", "PREPARING"}
+DISHES = [
+    "Paneer Tikka",
+    "Biryani",
+    "Masala Dosa",
+    "Butter Chicken",
+    "Thali",
+    "Chole Bhature",
+    "Veg Momos",
+    "Hakka Noodles",
+    "Gulab Jamun",
+    "Lassi",
+]
+
+
+def zipf_weights(count: int, skew: float) -> list[float]:
+    return list(itertools.accumulate(1 / (rank**skew) for rank in range(1, count + 1)))
+
+
+class Generator:
+    def __init__(self, args, rng: random.Random):
+        self.args = args
+        self.rng = rng
+        self.now = datetime.now(timezone.utc)
+
+    def uuid(self) -> uuid.UUID:
+        return uuid.UUID(int=self.rng.getrandbits(128), version=4)
+
+    def restaurants(self) -> list[dict]:
+        return [
+            {
+                "id": self.uuid(),
+                "name": f"Restaurant {index}",
+                "description": f"Generated restaurant {index}",
+                "address": f"{index} Scale Street",
+                "is_open": self.rng.random() > 0.1,
+            }
+            for index in range(self.args.restaurants)
+        ]
+
+    def menus(self, restaurants: list[dict]) -> list[dict]:
+        rows = []
+        for restaurant in restaurants:
+            count = self.rng.randint(
+                self.args.menus_per_restaurant // 2 or 1, self.args.menus_per_restaurant
+            )
+            for index in range(count):
+                rows.append(
+                    {
+                        "id": self.uuid(),
+                        "restaurant_id": restaurant["id"],
+                        "name": f"{self.rng.choice(DISHES)} {index}",
+                        "price": round(self.rng.uniform(40, 600), 2),
+                        "is_available": self.rng.random() > 0.05,
+                    }
+                )
+        return rows
+
+    def users(self, password_hash: str) -> list[dict]:
+        return [
+            {
+                "id": self.uuid(),
+                "first_name": "Scale",
+                "last_name": f"User{index}",
+                "email": f"user{index}@example.com",
+                "phone": f"9{index:09d}"[-10:],
+                "password": password_hash,
+                "role": "admin" if index == 0 else "user",
+                "address": f"{index} Load Lane",
+            }
+            for index in range(self.args.users)
+        ]
+
+    def orders(self, restaurants, menus_by_restaurant, users):
+        # Yields (orders, items, payments) chunks so memory stays bounded
+        # however many orders are requested.
+        restaurant_weights = zipf_weights(len(restaurants), self.args.restaurant_skew)
+        user_weights = zipf_weights(len(users), self.args.user_skew)
+        statuses = list(ORDER_STATUSES)
+        status_weights = list(itertools.accumulate(ORDER_STATUSES.values()))
+        span = timedelta(days=self.args.days).total_seconds()
+
+        remaining = self.args.orders
+        while remaining:
+            size = min(self.args.batch_size, remaining)
+            remaining -= size
+            orders, items, payments = [], [], []
+
+            picked_restaurants = self.rng.choices(
+                restaurants, cum_weights=restaurant_weights, k=size
+            )
+            picked_users = self.rng.choices(users, cum_weights=user_weights, k=size)
+
+            for restaurant, user in zip(picked_restaurants, picked_users):
+                order_id = self.uuid()
+                created_at = self.now - timedelta(seconds=self.rng.random() * span)
+                status = self.rng.choices(statuses, cum_weights=status_weights)[0]
+
+                menus = menus_by_restaurant[restaurant["id"]]
+                total = 0.0
+                picked = self.rng.sample(menus, k=min(len(menus), self.rng.randint(1, 4)))
+                for menu in picked:
+                    quantity = self.rng.randint(1, 3)
+                    total += menu["price"] * quantity
+                    items.append(
+                        {
+                            "id": self.uuid(),
+                            "order_id": order_id,
+                            "menu_id": menu["id"],
+                            "quantity": quantity,
+                            "price_at_order": menu["price"],
+                        }
+                    )
+
+                total = round(total, 2)
+                orders.append(
+                    {
+                        "id": order_id,
+                        "user_id": user["id"],
+                        "restaurant_id": restaurant["id"],
+                        "status": status,
+                        "total_amount": total,
+                        # orders.created_at is a naive UTC column.
+                        "created_at": created_at.replace(tzinfo=None),
+                    }
+                )
+
+                if status in PAID_STATUSES or self.rng.random() < 0.3:
+                    payments.append(
+                        self.payment(order_id, user["id"], total, status, created_at)
+                    )
+
+            yield orders, items, payments
+
+    def payment(self, order_id, user_id, amount, order_status, created_at) -> dict:
+        if order_status in PAID_STATUSES:
+            status = "SUCCESS"
+        else:
+            status = self.rng.choice(["PENDING", "EXPIRED", "FAILED"])
+
+        session_id = f"cs_gen_{order_id.hex}"
+        return {
+            "id": self.uuid(),
+            "order_id": order_id,
+            "user_id": user_id,
+            "stripe_session_id": session_id,
+            "checkout_url": f"https://checkout.stripe.com/c/pay/{session_id}",
+            "expires_at": created_at + timedelta(hours=24),
+            "amount": amount,
+            "currency": "INR",
+            "status": status,
+            "stripe_response": {"id": session_id, "object": "checkout.session"},
+            "created_at": created_at,
+        }
+
+
+def copy_value(value):
+    if value is None:
+        return None
+    if isinstance(value, bool):
+        return "t" if value else "f"
+    if isinstance(value, (datetime, uuid.UUID)):
+        return str(value)
+    if isinstance(value, dict):
+        return json.dumps(value)
+    return value
+
+
+class Writer:
+    def __init__(self, engine):
+        self.engine = engine
+        self.use_copy = engine.dialect.name == "postgresql"
+        self.counts: dict[str, int] = {}
+
+    def write(self, table, rows: list[dict]):
+        if not rows:
+            return
+        if self.use_copy:
+            self._copy(table, rows)
+        else:
+            # insertmanyvalues turns this into multi-row INSERT statements.
+            with self.engine.begin() as conn:
+                conn.execute(table.insert(), rows)
+        self.counts[table.name] = self.counts.get(table.name, 0) + len(rows)
+
+    def _copy(self, table, rows: list[dict]):
+        columns = list(rows[0])
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for row in rows:
+            writer.writerow([copy_value(row[column]) for column in columns])
+        buffer.seek(0)
+
+        raw = self.engine.raw_connection()
+        try:
+            with raw.cursor() as cursor:
+                cursor.copy_expert(
+                    f"COPY {table.name} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)",
+                    buffer,
+                )
+            raw.commit()
+        finally:
+            raw.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--database-url", required=True)
+    parser.add_argument("--restaurants", type=int, default=500)
+    parser.add_argument("--menus-per-restaurant", type=int, default=40)
+    parser.add_argument("--users", type=int, default=100000)
+    parser.add_argument("--orders", type=int, default=1000000)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--restaurant-skew", type=float, default=1.1)
+    parser.add_argument("--user-skew", type=float, default=1.2)
+    parser.add_argument("--batch-size", type=int, default=20000)
+    parser.add_argument("--password", default="password123")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    settings.configure(args.database_url)
+
+    from sqlalchemy import text
+
+    from app.database.db import Base, SessionLocal, create_missing_indexes, engine
+    from app.models.menu import Menu
+    from app.models.order import Order
+    from app.models.order_item import OrderItem
+    from app.models.payment import Payment
+    from app.models.restaurant import Restaurant
+    from app.models.user import User
+    from app.services.bootstrap_service import mark_existing_admin_bootstrap
+    from app.utils.hash import hash_password
+
+    Base.metadata.create_all(bind=engine)
+    create_missing_indexes(engine)
+
+    rng = random.Random(args.seed)
+    generator = Generator(args, rng)
+    writer = Writer(engine)
+    started = time.perf_counter()
+
+    restaurants = generator.restaurants()
+    menus = generator.menus(restaurants)
+    # One bcrypt hash shared by every user keeps generation fast.
+    users = generator.users(hash_password(args.password))
+
+    writer.write(Restaurant.__table__, restaurants)
+    writer.write(Menu.__table__, menus)
+    for start in range(0, len(users), args.batch_size):
+        writer.write(User.__table__, users[start:start + args.batch_size])
+
+    menus_by_restaurant: dict = {}
+    for menu in menus:
+        menus_by_restaurant.setdefault(menu["restaurant_id"], []).append(menu)
+
+    for orders, items, payments in generator.orders(
+        restaurants, menus_by_restaurant, users
+    ):
+        writer.write(Order.__table__, orders)
+        writer.write(OrderItem.__table__, items)
+        writer.write(Payment.__table__, payments)
+        print(
+            f"\r{writer.counts[Order.__table__.name]:,} / {args.orders:,} orders",
+            end="",
+            flush=True,
+        )
+    print()
+
+    with SessionLocal() as db:
+        mark_existing_admin_bootstrap(db)
+
+    if writer.use_copy:
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+            conn.execute(text("ANALYZE"))
+
+    elapsed = time.perf_counter() - started
+    for table, count in writer.counts.items():
+        print(f"{table:<16} {count:>12,}")
+    print(f"Done in {elapsed:.1f}s (admin login: user0@example.com)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+import json
+import math
+import platform
+import subprocess
+from collections import defaultdict
+from datetime import datetime, timezone
+from pathlib import Path
+
+
+def percentile(sorted_values: list[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    rank = max(math.ceil(pct / 100 * len(sorted_values)) - 1, 0)
+    return sorted_values[rank]
+
+
+class Recorder:
+    def __init__(self):
+        self.latencies: dict[str, list[float]] = defaultdict(list)
+        self.errors: dict[str, int] = defaultdict(int)
+
+    def record(self, route: str, seconds: float, ok: bool):
+        self.latencies[route].append(seconds * 1000)
+        if not ok:
+            self.errors[route] += 1
+
+    def summary(self, elapsed: float) -> dict:
+        routes = {}
+        everything = []
+        for route, values in sorted(self.latencies.items()):
+            everything.extend(values)
+            routes[route] = summarize(values, self.errors[route], elapsed)
+
+        return {
+            "routes": routes,
+            "total": summarize(everything, sum(self.errors.values()), elapsed),
+        }
+
+
+def summarize(values: list[float], errors: int, elapsed: float) -> dict:
+    ordered = sorted(values)
+    return {
+        "count": len(ordered),
+        "errors": errors,
+        "rps": round(len(ordered) / elapsed, 2) if elapsed else 0.0,
+        "mean_ms": round(sum(ordered) / len(ordered), 3) if ordered else 0.0,
+        "p50_ms": round(percentile(ordered, 50), 3),
+        "p95_ms": round(percentile(ordered, 95), 3),
+        "p99_ms": round(percentile(ordered, 99), 3),
+        "max_ms": round(ordered[-1], 3) if ordered else 0.0,
+    }
+
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def build_result(label: str, config: dict, summary: dict, extra: dict) -> dict:
+    return {
+        "meta": {
+            "label": label,
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "git_commit": git_commit(),
+            "python": platform.python_version(),
+            "config": config,
+        },
+        **summary,
+        "backends": extra,
+    }
+
+
+def save_result(result: dict, path: Path):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(result, indent=2, sort_keys=True))
+
+
+def load_result(path: Path) -> dict:
+    return json.loads(Path(path).read_text())
+
+
+def format_table(result: dict) -> str:
+    header = f"{'route':<40} {'count':>7} {'err':>5} {'rps':>8} {'p50':>9} {'p95':>9} {'p99':>9}"
+    lines = [header, "-" * len(header)]
+    rows = list(result["routes"].items()) + [("TOTAL", result["total"])]
+    for route, stats in rows:
+        lines.append(
+            f"{route:<40} {stats['count']:>7} {stats['errors']:>5} "
+            f"{stats['rps']:>8.1f} {stats['p50_ms']:>9.2f} "
+            f"{stats['p95_ms']:>9.2f} {stats['p99_ms']:>9.2f}"
+        )
+    return "\n".join(lines)
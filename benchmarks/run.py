@@ -0,0 +1,378 @@
+"""Drive a realistic request mix against app.main:app in-process.
+
+    python -m benchmarks.run --duration 30 --concurrency 20 --label baseline
+    python -m benchmarks.run --database-url postgresql://... --mix browse=80,place_order=20
+
+Stripe runs through the fake gateway, while SMTP and Google are served by
+local stub servers, so only the app and its database are measured.
+"""
+
+import argparse
+import asyncio
+import random
+import tempfile
+import time
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+
+from benchmarks import settings
+from benchmarks.fakes import (
+    FakeGoogleServer,
+    GoogleKeys,
+    StubSMTPServer,
+    checkout_completed_event,
+    sign_stripe_payload,
+)
+from benchmarks.report import Recorder, build_result, format_table, save_result
+
+WEBHOOK_SECRET = "whsec_bench"
+GOOGLE_CLIENT_ID = "bench-client"
+PASSWORD = "bench-password"
+
+DEFAULT_MIX = {
+    "browse": 40,
+    "place_order": 15,
+    "history": 15,
+    "checkout": 10,
+    "webhook_burst": 5,
+    "admin_status": 7,
+    "login": 5,
+    "google_login": 3,
+}
+
+
+def parse_mix(value: str) -> dict[str, int]:
+    mix = {}
+    for part in value.split(","):
+        name, _, weight = part.partition("=")
+        if name not in DEFAULT_MIX:
+            raise argparse.ArgumentTypeError(f"Unknown scenario: {name}")
+        mix[name] = int(weight or 1)
+    return mix
+
+
+def configure_environment(args, smtp: StubSMTPServer, google: FakeGoogleServer):
+    settings.configure(
+        args.database_url,
+        PAYMENT_GATEWAY="fake",
+        STRIPE_WEBHOOK_SECRET=WEBHOOK_SECRET,
+        EMAIL_HOST="127.0.0.1",
+        EMAIL_PORT=str(smtp.port),
+        EMAIL_USE_TLS="false",
+        EMAIL_USERNAME="",
+        GOOGLE_CLIENT_ID=GOOGLE_CLIENT_ID,
+        GOOGLE_TOKEN_URL=f"{google.base_url}/token",
+        GOOGLE_CERTS_URL=f"{google.base_url}/certs",
+    )
+
+
+class Bench:
+    def __init__(self, client, recorder: Recorder, rng: random.Random):
+        self.client = client
+        self.recorder = recorder
+        self.rng = rng
+        self.admin_headers: dict = {}
+        self.menus: dict[str, list[str]] = {}
+        self.orders: list[str] = []
+        # Orders the admin has moved past PLACED can no longer be paid.
+        self.advanced: set[str] = set()
+        self.pending_checkouts: list[tuple[str, str]] = []
+        self.recording = False
+
+    async def call(self, route: str, method: str, url: str, **kwargs):
+        started = time.perf_counter()
+        response = await self.client.request(method, url, **kwargs)
+        if self.recording:
+            self.recorder.record(
+                route, time.perf_counter() - started, response.status_code < 400
+            )
+        return response
+
+    async def register(self, email: str) -> dict:
+        response = await self.client.post(
+            "/auth/register",
+            json={
+                "first_name": "Bench",
+                "last_name": "User",
+                "email": email,
+                "phone": "9999999999",
+                "password": PASSWORD,
+                "address": "Bench Street",
+            },
+        )
+        response.raise_for_status()
+        response = await self.client.post(
+            "/auth/login", data={"username": email, "password": PASSWORD}
+        )
+        response.raise_for_status()
+        return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+    async def seed(self, restaurants: int, menus_per_restaurant: int):
+        self.admin_headers = await self.register(f"admin-{uuid.uuid4().hex}@example.com")
+        for index in range(restaurants):
+            response = await self.client.post(
+                "/restaurants",
+                json={"name": f"Restaurant {index}", "address": f"{index} Bench Road"},
+                headers=self.admin_headers,
+            )
+            response.raise_for_status()
+            restaurant_id = response.json()["id"]
+            self.menus[restaurant_id] = []
+            for item in range(menus_per_restaurant):
+                response = await self.client.post(
+                    "/menus",
+                    json={
+                        "restaurant_id": restaurant_id,
+                        "name": f"Dish {item}",
+                        "price": round(self.rng.uniform(50, 500), 2),
+                    },
+                    headers=self.admin_headers,
+                )
+                response.raise_for_status()
+                self.menus[restaurant_id].append(response.json()["id"])
+
+
+class VirtualUser:
+    def __init__(self, bench: Bench, email: str, headers: dict):
+        self.bench = bench
+        self.email = email
+        self.headers = headers
+        self.orders: list[str] = []
+
+    async def browse(self):
+        bench = self.bench
+        await bench.call("GET /restaurants", "GET", "/restaurants")
+        restaurant_id = bench.rng.choice(list(bench.menus))
+        await bench.call(
+            "GET /restaurants/{restaurant_id}", "GET", f"/restaurants/{restaurant_id}"
+        )
+        await bench.call(
+            "GET /menus/{restaurant_id}", "GET", f"/menus/{restaurant_id}"
+        )
+
+    async def place_order(self):
+        bench = self.bench
+        restaurant_id = bench.rng.choice(list(bench.menus))
+        menus = bench.rng.sample(
+            bench.menus[restaurant_id], k=min(len(bench.menus[restaurant_id]), 3)
+        )
+        response = await bench.call(
+            "POST /orders/with-items",
+            "POST",
+            "/orders/with-items",
+            json={
+                "restaurant_id": restaurant_id,
+                "items": [
+                    {"menu_id": menu_id, "quantity": bench.rng.randint(1, 3)}
+                    for menu_id in menus
+                ],
+            },
+            headers=self.headers,
+        )
+        if response.status_code == 200:
+            order_id = response.json()["id"]
+            self.orders.append(order_id)
+            bench.orders.append(order_id)
+
+    async def history(self):
+        bench = self.bench
+        response = await bench.call(
+            "GET /orders", "GET", "/orders", params={"limit": 20}, headers=self.headers
+        )
+        cursor = response.json().get("next_cursor") if response.is_success else None
+        if cursor:
+            await bench.call(
+                "GET /orders",
+                "GET",
+                "/orders",
+                params={"limit": 20, "cursor": cursor},
+                headers=self.headers,
+            )
+        if self.orders:
+            order_id = bench.rng.choice(self.orders)
+            await bench.call(
+                "GET /orders/{order_id}",
+                "GET",
+                f"/orders/{order_id}",
+                headers=self.headers,
+            )
+
+    async def checkout(self):
+        bench = self.bench
+        while self.orders and self.orders[-1] in bench.advanced:
+            self.orders.pop()
+        if not self.orders:
+            return await self.place_order()
+
+        order_id = self.orders.pop()
+        # Users double-click the pay button; the second call should reuse
+        # the live session.
+        for _ in range(2):
+            response = await bench.call(
+                "POST /payments/create/{order_id}",
+                "POST",
+                f"/payments/create/{order_id}",
+                headers=self.headers,
+            )
+        if response.status_code == 200:
+            session_id = response.json()["checkout_url"].rsplit("/", 1)[-1]
+            bench.pending_checkouts.append((session_id, order_id))
+
+    async def webhook_burst(self, size: int = 10):
+        bench = self.bench
+        burst = bench.pending_checkouts[:size]
+        del bench.pending_checkouts[:size]
+
+        async def deliver(session_id: str, order_id: str):
+            payload = checkout_completed_event(
+                f"evt_bench_{session_id}", session_id, order_id
+            )
+            # Stripe retries deliveries, so every event is sent twice.
+            for _ in range(2):
+                await bench.call(
+                    "POST /webhook/stripe",
+                    "POST",
+                    "/webhook/stripe",
+                    content=payload,
+                    headers={
+                        "stripe-signature": sign_stripe_payload(
+                            payload, WEBHOOK_SECRET
+                        ),
+                        "content-type": "application/json",
+                    },
+                )
+
+        await asyncio.gather(*(deliver(*checkout) for checkout in burst))
+
+    async def admin_status(self):
+        bench = self.bench
+        if not bench.orders:
+            return await self.place_order()
+
+        order_id = bench.rng.choice(bench.orders)
+        bench.advanced.add(order_id)
+        await bench.call(
+            "PUT /orders/{order_id}/status",
+            "PUT",
+            f"/orders/{order_id}/status",
+            json={"status": bench.rng.choice(["PREPARING", "READY", "DELIVERED"])},
+            headers=bench.admin_headers,
+        )
+
+    async def login(self):
+        await self.bench.call(
+            "POST /auth/login",
+            "POST",
+            "/auth/login",
+            data={"username": self.email, "password": PASSWORD},
+        )
+
+    async def google_login(self):
+        await self.bench.call(
+            "GET /auth/google/callback",
+            "GET",
+            "/auth/google/callback",
+            params={"code": f"google-{self.bench.rng.randrange(1000)}@example.com"},
+        )
+
+
+async def drive(user: VirtualUser, mix: dict[str, int], deadline: float):
+    names = list(mix)
+    weights = list(mix.values())
+    while time.perf_counter() < deadline:
+        scenario = user.bench.rng.choices(names, weights)[0]
+        await getattr(user, scenario)()
+
+
+async def run(args) -> tuple[dict, dict]:
+    import httpx
+
+    from app.main import app
+
+    recorder = Recorder()
+    rng = random.Random(args.seed)
+
+    transport = httpx.ASGITransport(app=app)
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://bench", timeout=60
+        ) as client:
+            bench = Bench(client, recorder, rng)
+            await bench.seed(args.restaurants, args.menus_per_restaurant)
+
+            users = []
+            for index in range(args.concurrency):
+                email = f"user-{index}-{uuid.uuid4().hex[:8]}@example.com"
+                users.append(VirtualUser(bench, email, await bench.register(email)))
+
+            if args.warmup:
+                deadline = time.perf_counter() + args.warmup
+                await asyncio.gather(*(drive(u, args.mix, deadline) for u in users))
+
+            bench.recording = True
+            started = time.perf_counter()
+            deadline = started + args.duration
+            await asyncio.gather(*(drive(u, args.mix, deadline) for u in users))
+            elapsed = time.perf_counter() - started
+            bench.recording = False
+
+            health = {}
+            for name in ("db-pool", "auth-cache", "response-cache", "webhook-worker"):
+                response = await client.get(f"/health/{name}")
+                health[name] = response.json()
+
+    return recorder.summary(elapsed), health
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--database-url")
+    parser.add_argument("--duration", type=float, default=30)
+    parser.add_argument("--warmup", type=float, default=3)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--restaurants", type=int, default=20)
+    parser.add_argument("--menus-per-restaurant", type=int, default=15)
+    parser.add_argument("--mix", type=parse_mix, default=DEFAULT_MIX)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--label", default="run")
+    parser.add_argument("--output", type=Path)
+    args = parser.parse_args()
+
+    if not args.database_url:
+        path = Path(tempfile.mkdtemp(prefix="oms-bench-")) / "bench.db"
+        args.database_url = f"sqlite:///{path}"
+
+    smtp = StubSMTPServer().start()
+    google = FakeGoogleServer(GoogleKeys(GOOGLE_CLIENT_ID)).start()
+    configure_environment(args, smtp, google)
+
+    summary, health = asyncio.run(run(args))
+
+    config = {
+        "database": args.database_url.split("://", 1)[0],
+        "duration": args.duration,
+        "concurrency": args.concurrency,
+        "restaurants": args.restaurants,
+        "menus_per_restaurant": args.menus_per_restaurant,
+        "mix": args.mix,
+        "seed": args.seed,
+    }
+    backends = {
+        "smtp_delivered": smtp.delivered,
+        "google_token_requests": google.token_requests,
+        "google_cert_requests": google.cert_requests,
+        "health": health,
+    }
+    result = build_result(args.label, config, summary, backends)
+
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    output = args.output or Path("benchmarks/results") / f"{args.label}-{stamp}.json"
+    save_result(result, output)
+
+    print(format_table(result))
+    print(f"\nSaved {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,27 @@
+import os
+
+# Placeholders for settings the app requires but the benchmarks never use
+# for real; anything already exported wins.
+DEFAULT_ENV = {
+    "SECRET_KEY": "bench-secret",
+    "ALGORITHM": "HS256",
+    "STRIPE_SECRET_KEY": "sk_test_bench",
+    "STRIPE_WEBHOOK_SECRET": "whsec_bench",
+    "EMAIL_HOST": "127.0.0.1",
+    "EMAIL_PORT": "25",
+    "EMAIL_USERNAME": "",
+    "EMAIL_PASSWORD": "",
+    "EMAIL_FROM": "bench@example.com",
+    "GOOGLE_CLIENT_ID": "bench-client",
+    "GOOGLE_CLIENT_SECRET": "bench",
+    "GOOGLE_REDIRECT_URI": "http://localhost/auth/google/callback",
+}
+
+
+def configure(database_url: str, **overrides: str):
+    # Settings are read at import time, so this must run before any app
+    # module is imported.
+    os.environ["DATABASE_URL"] = database_url
+    os.environ.update(overrides)
+    for name, value in DEFAULT_ENV.items():
+        os.environ.setdefault(name, value)
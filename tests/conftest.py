@@ -0,0 +1,79 @@
+import os
+import tempfile
+import uuid
+
+# Settings are read when app.core.config is imported, so the test
+# environment has to be in place before any app module is.
+_db_dir = tempfile.mkdtemp(prefix="oms-tests-")
+os.environ.update(
+    {
+        "DATABASE_URL": f"sqlite:///{_db_dir}/test.db",
+        "SECRET_KEY": "test-secret",
+        "STRIPE_SECRET_KEY": "sk_test",
+        "STRIPE_WEBHOOK_SECRET": "whsec_test",
+        "PAYMENT_GATEWAY": "fake",
+        "EMAIL_HOST": "localhost",
+        "EMAIL_PORT": "2525",
+        "EMAIL_USERNAME": "test",
+        "EMAIL_PASSWORD": "test",
+        "EMAIL_FROM": "test@example.com",
+        "GOOGLE_CLIENT_ID": "test",
+        "GOOGLE_CLIENT_SECRET": "test",
+        "GOOGLE_REDIRECT_URI": "http://localhost/callback",
+        "BCRYPT_ROUNDS": "4",
+        "PASSWORD_HASH_WORKERS": "1",
+        "LOG_LEVEL": "WARNING",
+    }
+)
+
+import pytest  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+from sqlalchemy import update  # noqa: E402
+
+from app.database.db import SessionLocal  # noqa: E402
+from app.main import app  # noqa: E402
+from app.models.user import User  # noqa: E402
+
+
+@pytest.fixture(scope="session")
+def client():
+    with TestClient(app) as client:
+        yield client
+
+
+@pytest.fixture
+def register(client):
+    def register(password: str = "pw", role: str | None = None) -> tuple[str, dict]:
+        email = f"{uuid.uuid4().hex}@example.com"
+        client.post(
+            "/auth/register",
+            json={
+                "first_name": "Test",
+                "last_name": "User",
+                "email": email,
+                "phone": "1",
+                "password": password,
+            },
+        )
+        if role is not None:
+            with SessionLocal() as db:
+                db.execute(update(User).where(User.email == email).values(role=role))
+                db.commit()
+        tokens = client.post(
+            "/auth/login", data={"username": email, "password": password}
+        ).json()
+        return email, tokens
+
+    return register
+
+
+@pytest.fixture
+def auth_headers(register):
+    _, tokens = register()
+    return {"Authorization": f"Bearer {tokens['access_token']}"}
+
+
+@pytest.fixture
+def admin_headers(register):
+    _, tokens = register(role="admin")
+    return {"Authorization": f"Bearer {tokens['access_token']}"}
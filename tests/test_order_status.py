@@ -0,0 +1,49 @@
+import pytest
+from pydantic import ValidationError
+
+from app.schemas.order_schema import OrderStatusUpdate
+
+
+@pytest.mark.parametrize("value", ["PREPARING", "preparing", "  Ready "])
+def test_known_statuses_are_normalized(value):
+    assert OrderStatusUpdate(status=value).status == value.strip().upper()
+
+
+@pytest.mark.parametrize("value", ["SHIPPED", "", "PAID-ISH", 3])
+def test_unknown_statuses_are_rejected(value):
+    with pytest.raises(ValidationError):
+        OrderStatusUpdate(status=value)
+
+
+def test_status_endpoint_rejects_unknown_status(client, auth_headers, admin_headers):
+    restaurant = client.post(
+        "/restaurants", json={"name": "R", "address": "A"}, headers=admin_headers
+    ).json()
+    menu = client.post(
+        "/menus",
+        json={"restaurant_id": restaurant["id"], "name": "M", "price": 10},
+        headers=admin_headers,
+    ).json()
+    order = client.post(
+        "/orders/with-items",
+        json={
+            "restaurant_id": restaurant["id"],
+            "items": [{"menu_id": menu["id"], "quantity": 1}],
+        },
+        headers=auth_headers,
+    ).json()
+
+    rejected = client.put(
+        f"/orders/{order['id']}/status",
+        json={"status": "shipped"},
+        headers=auth_headers,
+    )
+    accepted = client.put(
+        f"/orders/{order['id']}/status",
+        json={"status": "preparing"},
+        headers=auth_headers,
+    )
+
+    assert rejected.status_code == 422
+    assert accepted.status_code == 200
+    assert accepted.json()["status"] == "PREPARING"
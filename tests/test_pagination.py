@@ -0,0 +1,63 @@
+import uuid
+from datetime import datetime, timezone
+
+import pytest
+
+from app.utils.pagination import decode_cursor, encode_cursor
+
+
+def test_cursor_round_trip():
+    created_at = datetime(2024, 5, 1, 12, 30, 15, 123456, tzinfo=timezone.utc)
+    row_id = uuid.uuid4()
+
+    cursor = encode_cursor(created_at, row_id)
+
+    assert "=" not in cursor
+    assert decode_cursor(cursor) == (created_at, row_id)
+
+
+@pytest.mark.parametrize("cursor", ["", "not-a-cursor", "bm8tc2VwYXJhdG9y"])
+def test_invalid_cursor_is_rejected(cursor):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor)
+
+
+def test_order_pages_cover_every_order_once(client, auth_headers, admin_headers):
+    restaurant = client.post(
+        "/restaurants", json={"name": "R", "address": "A"}, headers=admin_headers
+    ).json()
+    menu = client.post(
+        "/menus",
+        json={"restaurant_id": restaurant["id"], "name": "M", "price": 10},
+        headers=admin_headers,
+    ).json()
+    created = {
+        client.post(
+            "/orders/with-items",
+            json={
+                "restaurant_id": restaurant["id"],
+                "items": [{"menu_id": menu["id"], "quantity": 1}],
+            },
+            headers=auth_headers,
+        ).json()["id"]
+        for _ in range(7)
+    }
+
+    seen = []
+    cursor = None
+    while True:
+        params = {"limit": 3, **({"cursor": cursor} if cursor else {})}
+        page = client.get("/orders", params=params, headers=auth_headers).json()
+        seen.extend(order["id"] for order in page["items"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+
+    assert len(seen) == len(created)
+    assert set(seen) == created
+
+
+def test_orders_reject_malformed_cursor(client, auth_headers):
+    response = client.get("/orders", params={"cursor": "%%%"}, headers=auth_headers)
+
+    assert response.status_code == 400
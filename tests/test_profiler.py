@@ -0,0 +1,67 @@
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+from app.core.config import settings
+from app.database.db import engine
+from app.database.profiler import (
+    NPlusOneError,
+    QueryStats,
+    check_repeated_queries,
+    profile_queries,
+)
+
+
+def repeated_stats(count: int) -> QueryStats:
+    stats = QueryStats()
+    stats.shapes["SELECT * FROM menus WHERE id = ?"] = count
+    stats.shapes["SELECT * FROM orders"] = 1
+    return stats
+
+
+def test_strict_mode_raises_on_repeated_statement(monkeypatch):
+    monkeypatch.setattr(settings, "DB_PROFILER_STRICT", True)
+    monkeypatch.setattr(settings, "DB_N_PLUS_ONE_THRESHOLD", 5)
+
+    with pytest.raises(NPlusOneError, match="ran 6 times"):
+        check_repeated_queries(repeated_stats(6), "GET /orders")
+
+
+def test_strict_mode_allows_statements_up_to_threshold(monkeypatch):
+    monkeypatch.setattr(settings, "DB_PROFILER_STRICT", True)
+    monkeypatch.setattr(settings, "DB_N_PLUS_ONE_THRESHOLD", 5)
+
+    check_repeated_queries(repeated_stats(5), "GET /orders")
+
+
+def test_non_strict_mode_does_not_raise(monkeypatch):
+    monkeypatch.setattr(settings, "DB_PROFILER_STRICT", False)
+    monkeypatch.setattr(settings, "DB_N_PLUS_ONE_THRESHOLD", 5)
+
+    check_repeated_queries(repeated_stats(50), "GET /orders")
+
+
+def test_counts_queries_and_time_per_shape():
+    with engine.connect() as conn, profile_queries() as stats:
+        for value in range(3):
+            conn.execute(text("SELECT :value"), {"value": value})
+        conn.execute(text("SELECT 1 + 1"))
+
+    assert stats.count == 4
+    assert stats.seconds > 0
+    assert stats.shapes["SELECT ?"] == 3
+    assert stats.repeated(2) == [("SELECT ?", 3)]
+
+
+def test_failed_statement_does_not_leave_a_start_time():
+    with engine.connect() as conn:
+        with profile_queries() as stats:
+            with pytest.raises(OperationalError):
+                conn.execute(text("SELECT * FROM missing_table"))
+            assert conn.info.get("query_started") == []
+
+            conn.execute(text("SELECT 1"))
+
+        assert conn.info.get("query_started") == []
+
+    assert stats.count == 1
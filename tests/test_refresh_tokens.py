@@ -0,0 +1,78 @@
+from datetime import datetime, timedelta, timezone
+from uuid import UUID
+
+import pytest
+from jose import jwt
+from sqlalchemy import select, update
+
+from app.core.config import settings
+from app.database.db import SessionLocal
+from app.models.refresh_token import RefreshToken
+
+
+@pytest.fixture(autouse=True)
+def rotate_every_refresh(monkeypatch):
+    monkeypatch.setattr(settings, "REFRESH_TOKEN_ROTATE_AFTER_MINUTES", 0)
+
+
+def jti(token: str) -> str:
+    return jwt.get_unverified_claims(token)["jti"]
+
+
+def refresh(client, token: str):
+    return client.post("/auth/refresh", params={"refresh_token": token})
+
+
+def rotated_long_ago(token: str):
+    with SessionLocal() as db:
+        db.execute(
+            update(RefreshToken)
+            .where(RefreshToken.jti == jti(token))
+            .values(revoked_at=datetime.now(timezone.utc) - timedelta(minutes=5))
+        )
+        db.commit()
+
+
+def test_refresh_rotates_the_token(client, register):
+    _, tokens = register()
+
+    response = refresh(client, tokens["refresh_token"])
+
+    assert response.status_code == 200
+    assert jti(response.json()["refresh_token"]) != jti(tokens["refresh_token"])
+
+
+def test_concurrent_refresh_gets_the_same_successor(client, register):
+    _, tokens = register()
+
+    first = refresh(client, tokens["refresh_token"])
+    second = refresh(client, tokens["refresh_token"])
+
+    assert first.status_code == second.status_code == 200
+    assert jti(first.json()["refresh_token"]) == jti(second.json()["refresh_token"])
+    assert refresh(client, second.json()["refresh_token"]).status_code == 200
+
+
+def test_replayed_token_revokes_the_family(client, register):
+    _, tokens = register()
+    successor = refresh(client, tokens["refresh_token"]).json()["refresh_token"]
+    rotated_long_ago(tokens["refresh_token"])
+
+    replay = refresh(client, tokens["refresh_token"])
+
+    assert replay.status_code == 401
+    assert refresh(client, successor).status_code == 401
+    with SessionLocal() as db:
+        family = UUID(jwt.get_unverified_claims(successor)["fam"])
+        revoked = db.scalars(
+            select(RefreshToken.revoked).where(RefreshToken.family == family)
+        ).all()
+    assert revoked and all(revoked)
+
+
+def test_logged_out_token_cannot_refresh(client, register):
+    _, tokens = register()
+
+    client.post("/auth/logout", params={"refresh_token": tokens["refresh_token"]})
+
+    assert refresh(client, tokens["refresh_token"]).status_code == 401